@@ -0,0 +1,536 @@
+"""
+xesapi 性能基准测试。全部请求发往本地的 MockServer，不需要联网。
+
+    python benchmark/run.py                          # 运行全部测试，输出 JSON 报告
+    python benchmark/run.py -o new.json --compare old.json   # 与之前的报告比较
+    python benchmark/run.py --only comment reply --latency 0.02
+
+与 --compare 比较时，任一指标变差超过 --threshold 则以状态码 1 退出。
+"""
+
+# local imports
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Callable, Awaitable, Any
+from contextlib import aclosing
+from http.cookies import SimpleCookie
+from collections import Counter
+from server import MockServer
+from xesapi import (
+    Client,
+    Store,
+    User,
+    Work,
+    Comment,
+    CommentGraph,
+    Hedge,
+    MemoryCache,
+    get_work,
+    get_works,
+    login,
+)
+import xesapi
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import asyncio
+import aiohttp
+import time
+import json
+import gc
+
+Case = Callable[[MockServer, argparse.Namespace], Awaitable[dict[str, Any]]]
+CASES: dict[str, Case] = {}
+
+# 越小越好的指标；其余数值指标（如 ops_per_sec）越大越好，不参与比较的指标不在这两个集合中。
+LOWER_IS_BETTER = {"seconds", "p50", "p99", "requests", "connections", "peak_bytes"}
+LOWER_IS_BETTER |= {"requests_per_10k", "bytes_per_item"}
+HIGHER_IS_BETTER = {"ops_per_sec", "items_per_sec", "mb_per_sec"}
+
+
+def case(name: str) -> Callable[[Case], Case]:
+    def register(fn: Case) -> Case:
+        CASES[name] = fn
+        return fn
+
+    return register
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def summarize(count: int, seconds: float, samples: list[float]) -> dict[str, Any]:
+    return {
+        "ops": count,
+        "seconds": seconds,
+        "ops_per_sec": count / seconds if seconds > 0 else 0.0,
+        "p50": percentile(samples, 0.5),
+        "p99": percentile(samples, 0.99),
+    }
+
+
+def client(server: MockServer, **kwargs: Any) -> Client:
+    assert server.url != None
+    return Client(server.url, server.url, server.url, **kwargs)
+
+
+def logged_in(api: Client) -> User:
+    cookie = SimpleCookie()
+    cookie["tal_token"], cookie["xes_rfh"] = "tal_token", "xes_rfh"
+    return User(cookie, api)
+
+
+async def timed(count: int, call: Callable[[int], Awaitable[Any]], concurrency: int):
+    samples: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            begin = time.perf_counter()
+            await call(i)
+            samples.append(time.perf_counter() - begin)
+
+    begin = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return summarize(count, time.perf_counter() - begin, samples)
+
+
+@case("get_work")
+async def bench_get_work(server: MockServer, args: argparse.Namespace):
+    async with client(server) as api:
+        result = await timed(
+            args.works, lambda i: get_work(i + 1, client=api), args.concurrency
+        )
+    return result | {"requests": sum(server.requests.values())}
+
+
+@case("get_works")
+async def bench_get_works(server: MockServer, args: argparse.Namespace):
+    async with client(server) as api:
+        begin = time.perf_counter()
+        count = 0
+        async for _, work in get_works(
+            range(1, args.works + 1), client=api, concurrency=args.concurrency
+        ):
+            if isinstance(work, Work):
+                count += 1
+        seconds = time.perf_counter() - begin
+    return summarize(count, seconds, []) | {"requests": sum(server.requests.values())}
+
+
+@case("hedge")
+async def bench_hedge(server: MockServer, args: argparse.Namespace):
+    # 没有长尾延迟时对冲不会触发，此时使用 5% 的长尾请求。
+    if server.stall_rate == 0:
+        server.stall_rate = 0.05
+    result: dict[str, Any] = {}
+    for name, hedge in (("off", None), ("on", Hedge(budget=0.1))):
+        server.reset()
+        async with client(server, retry=None, hedge=hedge) as api:
+            result[name] = await timed(
+                args.works, lambda i: get_work(i + 1, client=api), args.concurrency
+            ) | {"requests_per_10k": sum(server.requests.values()) * 1e4 / args.works}
+        if hedge != None:
+            result[name] |= {"hedged": hedge.hedged, "wins": hedge.wins}
+    return result
+
+
+@case("session_reuse")
+async def bench_session_reuse(server: MockServer, args: argparse.Namespace):
+    result: dict[str, Any] = {}
+    async with client(server) as api:
+        shared = await timed(
+            args.works, lambda i: get_work(i + 1, client=api), args.concurrency
+        )
+    result["shared"] = shared | {"connections": len(server.peers)}
+    server.reset()
+
+    async def fresh(i: int):
+        async with client(server) as api:
+            await get_work(i + 1, client=api)
+
+    result["per_call"] = await timed(args.works, fresh, args.concurrency)
+    result["per_call"]["connections"] = len(server.peers)
+    return result
+
+
+@case("comment")
+async def bench_comment(server: MockServer, args: argparse.Namespace):
+    result: dict[str, Any] = {}
+    for per_page in (15, "auto"):
+        for prefetch in (1, 4):
+            server.reset()
+            async with client(server) as api:
+                work = await get_work(1, client=api)
+                begin = time.perf_counter()
+                count = 0
+                async for _ in work.comment(prefetch, per_page):
+                    count += 1
+                seconds = time.perf_counter() - begin
+            requests = server.requests["/api/comments"]
+            result[f"per_page={per_page},prefetch={prefetch}"] = {
+                "items": count,
+                "seconds": seconds,
+                "items_per_sec": count / seconds if seconds > 0 else 0.0,
+                "requests": requests,
+                "requests_per_10k": requests * 10000 / count if count else 0.0,
+            }
+    return result
+
+
+@case("reply")
+async def bench_reply(server: MockServer, args: argparse.Namespace):
+    result: dict[str, Any] = {}
+    async with client(server) as api:
+        work = await get_work(1, client=api)
+        comments: list[Comment] = []
+        async with aclosing(work.comment(per_page="auto")) as iterator:
+            async for comment in iterator:
+                comments.append(comment)
+                if len(comments) >= args.threads:
+                    break
+        for per_page in (10, "auto"):
+            server.reset()
+            begin = time.perf_counter()
+            count = 0
+            for comment in comments:
+                async for _ in comment.reply(per_page=per_page):
+                    count += 1
+            seconds = time.perf_counter() - begin
+            result[f"per_page={per_page}"] = {
+                "items": count,
+                "seconds": seconds,
+                "items_per_sec": count / seconds if seconds > 0 else 0.0,
+                "requests": server.requests["/api/comments"],
+            }
+        server.reset()
+        begin = time.perf_counter()
+        count = 0
+        async with aclosing(work.thread(args.concurrency, per_page="auto")) as iterator:
+            async for _, replies in iterator:
+                count += 1 + len(replies)
+                if count >= args.threads * (server.replies + 1):
+                    break
+        seconds = time.perf_counter() - begin
+        result["thread"] = {
+            "items": count,
+            "seconds": seconds,
+            "items_per_sec": count / seconds if seconds > 0 else 0.0,
+            "requests": server.requests["/api/comments"],
+        }
+    return result
+
+
+@case("user_info")
+async def bench_user_info(server: MockServer, args: argparse.Namespace):
+    result: dict[str, Any] = {}
+    for cache in (False, True):
+        server.reset()
+        async with client(server, cache=MemoryCache() if cache else None) as api:
+            user = logged_in(api)
+            if cache:
+                call = lambda _: user.info()
+            else:
+                call = lambda _: api.fetch("GET", "/api/user/info", user)
+            result[f"cache={cache}"] = await timed(args.works, call, args.concurrency)
+            result[f"cache={cache}"]["requests"] = sum(server.requests.values())
+            result[f"cache={cache}"]["coalesced"] = api.coalesced
+    return result
+
+
+@case("login")
+async def bench_login(server: MockServer, args: argparse.Namespace):
+    async with client(server) as api:
+
+        async def flow(_: int):
+            captcha = await login("user", "password", api)
+            user = await captcha.resolve(server.captcha)
+            assert user.xes_rfh != None
+
+        result = await timed(args.logins, flow, args.concurrency)
+    return result | {"requests": sum(server.requests.values())}
+
+
+async def raw_comments(server: MockServer, count: int) -> list[bytes]:
+    # 直接获得评论页的原始 JSON，用于离线的解码和内存测试。
+    assert server.url != None
+    pages: list[bytes] = []
+    per_page = server.max_per_page
+    async with aiohttp.ClientSession() as session:
+        for page in range(1, (count - 1) // per_page + 2):
+            async with session.get(
+                server.url + "/api/comments",
+                params={
+                    "appid": 1001108,
+                    "topic_id": "CP_1",
+                    "parent_id": 0,
+                    "order_type": "",
+                    "page": page,
+                    "per_page": per_page,
+                },
+            ) as response:
+                pages.append(await response.read())
+    return pages
+
+
+@case("json_decode")
+async def bench_json_decode(server: MockServer, args: argparse.Namespace):
+    pages = await raw_comments(server, server.max_per_page * 20)
+    size = sum(len(i) for i in pages)
+    decoders: dict[str, Callable[[bytes], Any]] = {"json": json.loads}
+    for name in ("orjson", "ujson"):
+        try:
+            decoders[name] = __import__(name).loads
+        except ImportError:
+            pass
+    result: dict[str, Any] = {}
+    for name, loads in decoders.items():
+        rounds = max(1, args.decode_rounds)
+        begin = time.perf_counter()
+        for _ in range(rounds):
+            for page in pages:
+                loads(page)
+        seconds = time.perf_counter() - begin
+        result[name] = {
+            "seconds": seconds,
+            "mb_per_sec": size * rounds / seconds / 1e6 if seconds > 0 else 0.0,
+        }
+    return result
+
+
+def measure(build: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+@case("memory")
+async def bench_memory(server: MockServer, args: argparse.Namespace):
+    pages = await raw_comments(server, server.comments)
+    count = sum(len(json.loads(i)["data"]["data"]) for i in pages)
+    builders: dict[str, Callable[[], Any]] = {
+        "Comment": lambda: [
+            Comment(data) for page in pages for data in json.loads(page)["data"]["data"]
+        ],
+        "CompactComment": lambda: [
+            Comment(data).compact()
+            for page in pages
+            for data in json.loads(page)["data"]["data"]
+        ],
+    }
+    return {
+        name: {"items": count, "bytes_per_item": measure(build) / count}
+        for name, build in builders.items()
+    }
+
+
+@case("graph")
+async def bench_graph(server: MockServer, args: argparse.Namespace):
+    pages = await raw_comments(server, server.comments)
+    comments = [i for page in pages for i in json.loads(page)["data"]["data"]]
+    replies = [
+        {
+            "id": comment["id"] * 1000 + j,
+            "parent_id": comment["id"],
+            "target_id": comment["id"] if j == 0 else comment["id"] * 1000 + j - 1,
+            "user_id": str(j % 97),
+            "reply_user_id": comment["user_id"],
+            "likes": j % 7,
+            "content": f"回复 {j}",
+        }
+        for comment in comments
+        for j in range(server.replies)
+    ]
+    rows = comments + replies
+    builders: dict[str, Callable[[], Any]] = {
+        "dict": lambda: json.loads(json.dumps(rows)),
+        "CommentGraph": lambda: CommentGraph(json.loads(json.dumps(rows))),
+    }
+    result: dict[str, Any] = {
+        name: {"items": len(rows), "bytes_per_item": measure(build) / len(rows)}
+        for name, build in builders.items()
+    }
+    data, graph = builders["dict"](), builders["CommentGraph"]()
+    queries: dict[str, Callable[[], Any]] = {
+        "dict": lambda: Counter(i["user_id"] for i in data).most_common(10),
+        "CommentGraph": lambda: graph.top_users(10),
+    }
+    for name, query in queries.items():
+        begin = time.perf_counter()
+        for _ in range(args.decode_rounds):
+            query()
+        seconds = time.perf_counter() - begin
+        result[name]["top_users"] = {
+            "seconds": seconds,
+            "items_per_sec": len(rows) * args.decode_rounds / seconds,
+        }
+    return result
+
+
+@case("store")
+async def bench_store(server: MockServer, args: argparse.Namespace):
+    pages = [json.loads(i)["data"]["data"] for i in await raw_comments(server, 1000)]
+    result: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        store = Store(os.path.join(directory, "bench.db"))
+        count = 0
+        begin = time.perf_counter()
+        for i in range(args.store_rounds):
+            for page in pages:
+                # 每轮换一个评论区，避免只是覆盖同样的行。
+                page = [
+                    c | {"id": c["id"] + i * 10000000, "topic_id": f"CP_{i}"}
+                    for c in page
+                ]
+                store.upsert_comments(page)
+                count += len(page)
+        seconds = time.perf_counter() - begin
+        result["ingest"] = {
+            "items": count,
+            "seconds": seconds,
+            "items_per_sec": count / seconds if seconds > 0 else 0.0,
+        }
+        queries: dict[str, Callable[[], Any]] = {
+            "comments": lambda: list(store.comments("CP_0")),
+            "top_comments": lambda: store.top_comments(10),
+            "commented_topics": lambda: store.commented_topics("1"),
+        }
+        for name, query in queries.items():
+            samples = []
+            for _ in range(20):
+                begin = time.perf_counter()
+                query()
+                samples.append(time.perf_counter() - begin)
+            result[name] = summarize(len(samples), sum(samples), samples)
+        store.close()
+    return result
+
+
+def flatten(data: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    flat: dict[str, float] = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            flat |= flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(old: dict[str, Any], new: dict[str, Any], threshold: float) -> list[str]:
+    """
+    比较两份报告。
+
+    Returns:
+        list[str]: 变差超过 threshold 的指标
+    """
+    before, after = flatten(old["results"]), flatten(new["results"])
+    regressions: list[str] = []
+    for key, value in after.items():
+        metric = key.rsplit(".", 1)[-1]
+        if key not in before or before[key] == 0:
+            continue
+        change = (value - before[key]) / before[key]
+        if metric in LOWER_IS_BETTER and change > threshold:
+            regressions.append(
+                f"{key}: {before[key]:.6g} -> {value:.6g} (+{change:.1%})"
+            )
+        elif metric in HIGHER_IS_BETTER and change < -threshold:
+            regressions.append(
+                f"{key}: {before[key]:.6g} -> {value:.6g} ({change:.1%})"
+            )
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for name in args.only or CASES:
+        server = MockServer(
+            latency=args.latency,
+            jitter=args.jitter,
+            stall_rate=args.stall_rate,
+            stall=args.stall,
+            error_rate=args.error_rate,
+            comments=args.comments,
+            replies=args.replies,
+            seed=args.seed,
+        )
+        async with server:
+            print(f"running {name}...", file=sys.stderr)
+            results[name] = await CASES[name](server, args)
+    return {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "aiohttp": aiohttp.__version__,
+            "json_loads": getattr(xesapi.client._default_loads, "__module__", None),
+            "config": {
+                key: value
+                for key, value in vars(args).items()
+                if key not in ("output", "compare", "only")
+            },
+        },
+        "results": results,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", nargs="*", choices=list(CASES), help="只运行这些测试")
+    parser.add_argument("-o", "--output", help="报告输出路径，默认为标准输出")
+    parser.add_argument("--compare", help="与此报告比较")
+    parser.add_argument("--threshold", type=float, default=0.2, help="允许的变差比例")
+    parser.add_argument("--latency", type=float, default=0.0, help="服务器延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="随机延迟上限（秒）")
+    parser.add_argument(
+        "--stall-rate", type=float, default=0.0, help="请求额外延迟 --stall 秒的概率"
+    )
+    parser.add_argument(
+        "--stall", type=float, default=0.5, help="长尾请求的额外延迟（秒）"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="GET 返回 503 的概率"
+    )
+    parser.add_argument("--comments", type=int, default=1000, help="每个作品的评论数")
+    parser.add_argument("--replies", type=int, default=12, help="每条评论的回复数")
+    parser.add_argument("--works", type=int, default=500, help="获取作品的次数")
+    parser.add_argument("--logins", type=int, default=100, help="登录次数")
+    parser.add_argument("--threads", type=int, default=50, help="展开回复的评论数")
+    parser.add_argument("--concurrency", type=int, default=10, help="并发数")
+    parser.add_argument("--decode-rounds", type=int, default=20, help="JSON 解码轮数")
+    parser.add_argument("--store-rounds", type=int, default=10, help="写入存储的轮数")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output == None:
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if args.compare != None:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"]["config"] != report["meta"]["config"]:
+            print("warning: reports were run with different options", file=sys.stderr)
+        regressions = compare(baseline, report, args.threshold)
+        for line in regressions:
+            print("regression:", line, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
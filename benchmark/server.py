@@ -0,0 +1,253 @@
+from typing import Optional, Any
+from collections import Counter
+from aiohttp import web
+import asyncio
+import random
+
+# 1x1 的 JPEG，作为验证码图片返回。
+_CAPTCHA = (
+    "data:image/jpeg;base64,/9j/4AAQSkZJRgABAQEASABIAAD/2wBDAP//////////////////////"
+    "////////////////////////////////////////////////////////////////wgALCAABAAEBAREA"
+    "/8QAFBABAAAAAAAAAAAAAAAAAAAAAP/aAAgBAQABPxA="
+)
+
+
+class MockServer:
+    """
+    离线运行的学而思编程 / 好未来 passport 模拟服务器。
+
+    所有接口都在同一个地址上，把 Client 的 base_url、passport_url 和 login_url 都设为 url 即可。
+    数据由作品id确定性地生成：作品 id 的评论区有 comments 条评论，每条评论有 replies 条回复。
+    """
+
+    latency: float  # 每个请求的固定延迟（秒）
+    jitter: float  # 额外的随机延迟上限（秒）
+    stall_rate: float  # 请求额外延迟 stall 秒的概率，用于模拟长尾延迟
+    stall: float  # 长尾请求的额外延迟（秒）
+    error_rate: float  # GET 请求返回 503 的概率
+    comments: int  # 每个作品的评论数
+    replies: int  # 每条评论的回复数
+    embedded: int  # 评论自带的回复数
+    max_per_page: int  # 服务器接受的最大每页数量
+    captcha: str  # 正确的验证码
+    requests: "Counter[str]"  # 各接口的请求数
+    peers: set[Any]  # 客户端连接（用于统计新建的连接数）
+    url: Optional[str]  # 服务器地址，启动后可用
+    __runner: Optional[web.AppRunner]
+    __random: random.Random
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        stall_rate: float = 0.0,
+        stall: float = 1.0,
+        error_rate: float = 0.0,
+        comments: int = 1000,
+        replies: int = 12,
+        embedded: int = 2,
+        max_per_page: int = 50,
+        captcha: str = "0000",
+        seed: int = 0,
+    ):
+        """
+        初始化 MockServer。
+
+        Args:
+            latency (float, optional): 每个请求的固定延迟（秒）。默认为 0。
+            jitter (float, optional): 额外的随机延迟上限（秒）。默认为 0。
+            stall_rate (float, optional): 请求额外延迟 stall 秒的概率。默认为 0。
+            stall (float, optional): 长尾请求的额外延迟（秒）。默认为 1。
+            error_rate (float, optional): GET 请求返回 503 的概率。默认为 0。
+            comments (int, optional): 每个作品的评论数。默认为 1000。
+            replies (int, optional): 每条评论的回复数。默认为 12。
+            embedded (int, optional): 评论自带的回复数。默认为 2。
+            max_per_page (int, optional): 服务器接受的最大每页数量。默认为 50。
+            captcha (str, optional): 正确的验证码。默认为 "0000"。
+            seed (int, optional): 随机数种子。默认为 0。
+        """
+        self.latency, self.jitter, self.error_rate = latency, jitter, error_rate
+        self.stall_rate, self.stall = stall_rate, stall
+        self.comments, self.replies, self.embedded = comments, replies, embedded
+        self.max_per_page, self.captcha = max_per_page, captcha
+        self.requests, self.peers = Counter(), set()
+        self.url = None
+        self.__runner = None
+        self.__random = random.Random(seed)
+
+    def reset(self):
+        """
+        清空请求统计。
+        """
+        self.requests.clear()
+        self.peers.clear()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        启动服务器。
+
+        Args:
+            host (str, optional): 监听地址。默认为 "127.0.0.1"。
+            port (int, optional): 端口，0 为随机端口。默认为 0。
+
+        Returns:
+            str: 服务器地址
+        """
+        app = web.Application(middlewares=[self.__middleware])
+        app.router.add_get("/api/compilers/v2/{id}", self.__work)
+        app.router.add_get("/api/comments", self.__comments)
+        app.router.add_get("/api/user/info", self.__info)
+        app.router.add_post("/api/comments/submit", self.__ok)
+        app.router.add_post("/api/compilers/{id}/like", self.__ok)
+        app.router.add_post("/api/compilers/{id}/unlike", self.__ok)
+        app.router.add_post("/v1/web/captcha/get", self.__captcha)
+        app.router.add_post("/v1/web/login/pwd", self.__login)
+        app.router.add_post("/V1/Web/getToken", self.__token)
+        self.__runner = web.AppRunner(app, access_log=None)
+        await self.__runner.setup()
+        site = web.TCPSite(self.__runner, host, port)
+        await site.start()
+        port = self.__runner.addresses[0][1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def close(self):
+        """
+        关闭服务器。
+        """
+        if self.__runner != None:
+            await self.__runner.cleanup()
+            self.__runner = None
+
+    async def __aenter__(self) -> "MockServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_: Any):
+        await self.close()
+
+    @web.middleware
+    async def __middleware(
+        self, request: web.Request, handler: Any
+    ) -> web.StreamResponse:
+        route = request.match_info.route.resource
+        self.requests[route.canonical if route != None else request.path] += 1
+        self.peers.add(request.transport.get_extra_info("peername"))
+        delay = self.latency + self.__random.uniform(0, self.jitter)
+        if self.__random.random() < self.stall_rate:
+            delay += self.stall
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if request.method == "GET" and self.__random.random() < self.error_rate:
+            return web.Response(status=503, text="Service Unavailable")
+        return await handler(request)
+
+    @staticmethod
+    def __response(data: Any) -> web.Response:
+        return web.json_response({"stat": 1, "status": 1, "msg": None, "data": data})
+
+    def __reply(self, topic_id: str, parent_id: int, i: int) -> dict[str, Any]:
+        return {
+            "id": parent_id * 1000 + i,
+            "parent_id": parent_id,
+            "target_id": parent_id,
+            "topic_id": topic_id,
+            "user_id": str(i % 97),
+            "reply_user_id": str(parent_id % 89),
+            "username": f"user{i % 97}",
+            "likes": i % 7,
+            "created_at": str(1700000000 + i),
+            "content": f"回复 {i}",
+        }
+
+    def __comment(self, topic_id: str, base: int, i: int) -> dict[str, Any]:
+        id = base + self.comments - i
+        return {
+            "id": id,
+            "top": 0,
+            "topic_id": topic_id,
+            "user_id": str(i % 89),
+            "username": f"user{i % 89}",
+            "likes": i % 11,
+            "replies": self.replies,
+            "create_at": str(1700000000 - i),
+            "content": f"评论 {i} " + "内容" * (i % 20),
+            "reply_list": {
+                "data": [
+                    self.__reply(topic_id, id, j)
+                    for j in range(min(self.embedded, self.replies))
+                ],
+                "hasMore": self.replies > self.embedded,
+                "total": self.replies,
+            },
+        }
+
+    async def __work(self, request: web.Request) -> web.Response:
+        id = int(request.match_info["id"])
+        return self.__response(
+            {
+                "id": id,
+                "name": f"作品 {id}",
+                "topic_id": f"CP_{id}",
+                "user_id": id % 1000,
+                "lang": "python",
+                "likes": id % 100,
+                "views": id % 10000,
+                "comments": self.comments,
+                "favorites": 0,
+                "source_code_views": 0,
+                "popular_score": 0,
+                "published_at": "2023-01-01 00:00:00",
+            }
+        )
+
+    async def __comments(self, request: web.Request) -> web.Response:
+        query = request.query
+        page, parent_id = int(query["page"]), int(query["parent_id"])
+        per_page = min(int(query["per_page"]), self.max_per_page)
+        topic_id = query["topic_id"]
+        total = self.comments if parent_id == 0 else self.replies
+        ids = range((page - 1) * per_page, min(page * per_page, total))
+        if parent_id == 0:
+            base = int(topic_id.rsplit("_", 1)[-1] or 0) * 1000000
+            data = [self.__comment(topic_id, base, i) for i in ids]
+        else:
+            data = [self.__reply(topic_id, parent_id, i) for i in ids]
+        return self.__response(
+            {"data": data, "page": str(page), "per_page": str(per_page), "total": total}
+        )
+
+    async def __info(self, request: web.Request) -> web.Response:
+        if "xes_rfh" not in request.cookies:
+            return web.json_response(
+                {"stat": 0, "status": 0, "msg": "未登录", "data": None}
+            )
+        return self.__response({"id": "1", "nickname": "bench", "realname": "bench"})
+
+    async def __ok(self, _: web.Request) -> web.Response:
+        return self.__response(None)
+
+    async def __captcha(self, _: web.Request) -> web.Response:
+        return web.json_response(
+            {"errcode": 0, "errmsg": "", "data": {"captcha": _CAPTCHA}}
+        )
+
+    async def __login(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if form.get("captcha") != self.captcha:
+            return web.json_response(
+                {"errcode": 1, "errmsg": "验证码错误", "data": None}
+            )
+        return web.json_response(
+            {
+                "errcode": 0,
+                "errmsg": "",
+                "data": {"code": "code", "passport_token": "t"},
+            }
+        )
+
+    async def __token(self, _: web.Request) -> web.Response:
+        response = web.json_response({"errcode": 0, "errmsg": "", "data": None})
+        response.set_cookie("tal_token", "tal_token")
+        response.set_cookie("xes_rfh", "xes_rfh")
+        return response
@@ -2,13 +2,12 @@
 import sys
 sys.path.append("..")
 
-from xesapi import login, Captcha, User, Info_Data
+from xesapi import SyncClient, Captcha, User, Info_Data
 from typing import Union, Callable, Optional
 from customtkinter import CTkFont
 from PIL import Image, ImageTk
 from tkinter import Event
 import customtkinter as ctk
-import asyncio
 import base64
 import io
 
@@ -258,7 +257,7 @@ class App(ctk.CTk):
     user: Optional[User]
     info: Optional[Info_Data]
     scene: Union[LoginScene, CaptchaScene, ResultScene, LoadingScene]
-    eventloop: asyncio.AbstractEventLoop
+    client: SyncClient
 
     def __login(self, username: str, password: str):
         self.username, self.password = username, password
@@ -266,9 +265,7 @@ class App(ctk.CTk):
         self.scene = LoadingScene(self)
         self.update()
         try:
-            self.captcha = self.eventloop.run_until_complete(
-                login(self.username, self.password)
-            )
+            self.captcha = self.client.login(self.username, self.password)
         except Exception as err:
             self.scene.destroy()
             self.scene = ErrorScene(self, str(err))
@@ -284,8 +281,8 @@ class App(ctk.CTk):
         self.scene = LoadingScene(self)
         self.update()
         try:
-            self.user = self.eventloop.run_until_complete(self.captcha.resolve(captcha))
-            self.info = self.eventloop.run_until_complete(self.user.info())
+            self.user = self.client.resolve(self.captcha, captcha)
+            self.info = self.client.info(self.user)
         except Exception as err:
             self.scene.destroy()
             self.scene = ErrorScene(self, str(err))
@@ -301,9 +298,9 @@ class App(ctk.CTk):
         self.scene = LoginScene(self, self.__login)
         self.scene.username_entry.focus()
 
-    def __init__(self, eventloop: asyncio.AbstractEventLoop):
+    def __init__(self, client: SyncClient):
         super().__init__()
-        self.eventloop = eventloop
+        self.client = client
         self.user = self.captcha = None
         self.title("XesAPIExtended utility")
         self.geometry("300x150")
@@ -311,5 +308,6 @@ class App(ctk.CTk):
         self.__entry()
 
 if __name__ == "__main__":
-    app = App(asyncio.new_event_loop())
-    app.mainloop()
+    with SyncClient() as client:
+        app = App(client)
+        app.mainloop()
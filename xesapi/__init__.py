@@ -3,5 +3,41 @@ __version__ = "0.0.1"
 from .user import User as User, Info_Data as Info_Data
 from .login import Captcha as Captcha, login as login
 from .base import APIException as APIException
+from .client import Client as Client
+from .cache import (
+    Cache as Cache,
+    CacheEntry as CacheEntry,
+    MemoryCache as MemoryCache,
+    DiskCache as DiskCache,
+)
 from .type import Info_Data as Info_Data
-from .work import Work as Work, get_work as get_work, Comment as Comment, Reply as Reply
+from .work import (
+    Work as Work,
+    get_work as get_work,
+    get_works as get_works,
+    Comment as Comment,
+    Reply as Reply,
+)
+from .limit import RateLimiter as RateLimiter, Retry as Retry, Hedge as Hedge
+from .model import (
+    CompactWork as CompactWork,
+    CompactComment as CompactComment,
+    CompactReply as CompactReply,
+)
+from .export import export_comments as export_comments, read_columnar as read_columnar
+from .store import Store as Store
+from .action import ActionQueue as ActionQueue, ActionResult as ActionResult
+from .metrics import Metrics as Metrics, RequestEvent as RequestEvent
+from .session import (
+    SessionStore as SessionStore,
+    MemorySessionStore as MemorySessionStore,
+    FileSessionStore as FileSessionStore,
+    restore_user as restore_user,
+)
+from .pool import UserPool as UserPool
+from .crawl import crawl as crawl, CrawlProgress as CrawlProgress
+from .sync import SyncClient as SyncClient
+from .asset import AssetCache as AssetCache, AssetDownloader as AssetDownloader
+from .watch import WorkWatcher as WorkWatcher, WorkDelta as WorkDelta
+from .graph import CommentGraph as CommentGraph
+from .deadline import Deadline as Deadline
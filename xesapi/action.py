@@ -0,0 +1,251 @@
+from typing import Optional, Union, Literal, Awaitable, Callable, Any
+from collections import Counter
+from .work import Work, Comment, Reply
+from .client import Client, _use_client
+import asyncio
+import time
+
+ActionKind = Literal["like", "unlike", "send"]
+Target = Union[Work, Comment, Reply]
+
+
+class ActionResult:
+    """
+    一个操作的结果。
+    """
+
+    kind: ActionKind  # 操作类型
+    target: Target  # 操作对象
+    content: Optional[str]  # 评论内容，仅 send 有
+    error: Optional[Exception]  # 失败时的异常
+    coalesced: bool  # 是否被合并（与其它操作共用请求，或被之后相反的操作取代）
+    done: bool  # 是否已执行
+
+    def __init__(self, kind: ActionKind, target: Target, content: Optional[str]):
+        """
+        初始化 ActionResult。
+
+        Args:
+            kind (ActionKind): 操作类型
+            target (Target): 操作对象
+            content (Optional[str]): 评论内容
+        """
+        self.kind, self.target, self.content = kind, target, content
+        self.error, self.coalesced, self.done = None, False, False
+
+    @property
+    def ok(self) -> bool:
+        """
+        操作是否成功（被取代的操作视为成功）。
+
+        Returns:
+            bool: 是否成功
+        """
+        return self.done and self.error == None
+
+    def __repr__(self) -> str:
+        return (
+            f"<ActionResult kind={self.kind} id={self.target.data['id']} "
+            f"ok={self.ok} coalesced={self.coalesced} error={self.error!r}>"
+        )
+
+
+class ActionQueue:
+    """
+    批量操作队列：点赞、踩和发布评论/回复先排队，flush 时共用连接池并发执行。
+
+    同一用户对同一作品排队的点赞和踩只执行最后一个；内容相同的重复评论只发送一次。
+    操作在队列的 client 上执行；队列没有 client 时使用操作对象自带的客户端，
+    都没有的操作在 flush 时共用一个临时客户端。
+    """
+
+    client: Optional[Client]  # 执行操作的客户端
+    concurrency: int  # 最大并发数
+    submitted: int  # 排队的操作数
+    sent: int  # 实际发出的请求数
+    coalesced: int  # 被合并的操作数
+    succeeded: int  # 成功的请求数
+    failed: int  # 失败的请求数
+    errors: "Counter[str]"  # 失败原因统计
+    elapsed: float  # flush 累计耗时（秒）
+    __pending: dict[
+        tuple[Any, ...], tuple[ActionResult, Callable[[Client], Awaitable[None]]]
+    ]
+    __results: list[ActionResult]
+    __followers: dict[tuple[Any, ...], list[ActionResult]]
+
+    def __init__(self, concurrency: int = 4, client: Optional[Client] = None):
+        """
+        初始化 ActionQueue。
+
+        Args:
+            concurrency (int, optional): 最大并发数。默认为 4。
+            client (Optional[Client], optional): 执行所有操作的客户端。默认使用操作对象自带的客户端。
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.client, self.concurrency = client, concurrency
+        self.submitted = self.sent = self.coalesced = 0
+        self.succeeded = self.failed = 0
+        self.errors = Counter()
+        self.elapsed = 0.0
+        self.__pending, self.__results, self.__followers = {}, [], {}
+
+    def __enqueue(
+        self,
+        key: tuple[Any, ...],
+        kind: ActionKind,
+        target: Target,
+        content: Optional[str],
+        call: Callable[[Client], Awaitable[None]],
+    ) -> ActionResult:
+        result = ActionResult(kind, target, content)
+        self.submitted += 1
+        self.__results.append(result)
+        previous = self.__pending[key][0] if key in self.__pending else None
+        if previous != None and previous.kind == kind:
+            # 完全相同的操作：共用一次请求。
+            result.coalesced = True
+            self.coalesced += 1
+            self.__followers.setdefault(key, []).append(result)
+            return result
+        if previous != None:
+            # 相反的操作：之前排队的操作（以及与它合并的操作）被取代，不再发送。
+            for i in [previous] + self.__followers.pop(key, []):
+                if not i.coalesced:
+                    i.coalesced = True
+                    self.coalesced += 1
+                i.done = True
+        self.__pending[key] = (result, call)
+        return result
+
+    def like(self, work: Work) -> ActionResult:
+        """
+        排队点赞作品。
+
+        Args:
+            work (Work): 作品
+
+        Returns:
+            ActionResult: 结果，flush 后可用
+        """
+        return self.__enqueue(
+            ("vote", id(work.user), work.data["id"]),
+            "like",
+            work,
+            None,
+            lambda client: Work(work.data, work.user, client).like(),
+        )
+
+    def unlike(self, work: Work) -> ActionResult:
+        """
+        排队踩作品。
+
+        Args:
+            work (Work): 作品
+
+        Returns:
+            ActionResult: 结果，flush 后可用
+        """
+        return self.__enqueue(
+            ("vote", id(work.user), work.data["id"]),
+            "unlike",
+            work,
+            None,
+            lambda client: Work(work.data, work.user, client).unlike(),
+        )
+
+    def send(self, target: Target, content: str) -> ActionResult:
+        """
+        排队在作品下发布评论，或回复评论/回复。
+
+        Args:
+            target (Target): 作品、评论或回复
+            content (str): 内容
+
+        Returns:
+            ActionResult: 结果，flush 后可用
+        """
+        key = ("send", id(target.user), type(target).__name__, target.data["id"])
+        return self.__enqueue(
+            key + (content,),
+            "send",
+            target,
+            content,
+            lambda client: target.__class__(target.data, target.user, client).send(
+                content
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.__pending)
+
+    async def flush(self) -> list[ActionResult]:
+        """
+        执行所有排队的操作。单个操作失败不会影响其它操作。
+
+        Returns:
+            list[ActionResult]: 自上次 flush 以来排队的所有操作的结果，按排队顺序
+        """
+        pending, followers = self.__pending, self.__followers
+        results = self.__results
+        self.__pending, self.__results, self.__followers = {}, [], {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        begin = time.monotonic()
+
+        async def run(
+            client: Client,
+            key: tuple[Any, ...],
+            action: ActionResult,
+            call: Callable[[Client], Awaitable[None]],
+        ):
+            async with semaphore:
+                self.sent += 1
+                try:
+                    await call(client)
+                    self.succeeded += 1
+                except Exception as err:
+                    # 包括响应无法解析等意外错误，只记为该操作失败。
+                    action.error = err
+                    self.failed += 1
+                    self.errors[str(err)] += 1
+            action.done = True
+            for i in followers.get(key, []):
+                i.error, i.done = action.error, True
+
+        # 连接池在第一次请求时才创建，所有操作都有客户端时临时客户端不会打开连接。
+        async with _use_client(self.client) as default:
+            await asyncio.gather(
+                *(
+                    run(
+                        (
+                            default
+                            if self.client != None or action.target.client == None
+                            else action.target.client
+                        ),
+                        key,
+                        action,
+                        call,
+                    )
+                    for key, (action, call) in pending.items()
+                )
+            )
+        self.elapsed += time.monotonic() - begin
+        return results
+
+    def stats(self) -> dict[str, Any]:
+        """
+        获得统计信息。
+
+        Returns:
+            dict[str, Any]: 计数、失败原因和吞吐量（请求/秒）
+        """
+        return {
+            "submitted": self.submitted,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "errors": dict(self.errors),
+            "throughput": self.sent / self.elapsed if self.elapsed > 0 else 0.0,
+        }
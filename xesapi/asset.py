@@ -0,0 +1,385 @@
+from typing import Optional, Iterable, Any
+from urllib.parse import urljoin, urlsplit
+from .client import Client
+from .base import APIException
+from .type import Work_Data
+import tempfile
+import shutil
+import hashlib
+import asyncio
+import aiohttp
+import sqlite3
+import time
+import os
+import re
+
+_MD5 = re.compile(r"^([0-9a-f]{32})(\.\w+)?$")
+
+
+class AssetCache:
+    """
+    按内容寻址的本地文件缓存。文件以 SHA-256 命名，内容相同的素材只保存一份。
+
+    索引把素材的键（已知 MD5 时为 MD5，否则为去掉 CDN 主机的路径）映射到文件。
+    """
+
+    path: str  # 缓存目录
+    __db: sqlite3.Connection
+
+    def __init__(self, path: str):
+        """
+        初始化 AssetCache。
+
+        Args:
+            path (str): 缓存目录，不存在时自动创建
+        """
+        self.path = path
+        os.makedirs(os.path.join(path, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(path, "tmp"), exist_ok=True)
+        # 下载器在事件循环线程中使用索引，它可能不是创建缓存的线程。
+        self.__db = sqlite3.connect(
+            os.path.join(path, "index.sqlite"), check_same_thread=False
+        )
+        self.__db.execute(
+            "CREATE TABLE IF NOT EXISTS assets "
+            "(key TEXT PRIMARY KEY, digest TEXT, size INTEGER, stored REAL)"
+        )
+        self.__db.commit()
+
+    def object_path(self, digest: str) -> str:
+        """
+        获得内容对应的文件路径。
+
+        Args:
+            digest (str): SHA-256 十六进制摘要
+
+        Returns:
+            str: 文件路径
+        """
+        return os.path.join(self.path, "objects", digest[:2], digest)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        查找已缓存的素材。
+
+        Args:
+            key (str): 素材的键
+
+        Returns:
+            Optional[str]: 文件路径，未缓存时为 None
+        """
+        row = self.__db.execute(
+            "SELECT digest FROM assets WHERE key = ?", (key,)
+        ).fetchone()
+        if row == None or not os.path.exists(self.object_path(row[0])):
+            return None
+        return self.object_path(row[0])
+
+    def temp(self) -> str:
+        """
+        获得一个临时文件路径，下载完成后用 put 放入缓存。
+
+        Returns:
+            str: 临时文件路径
+        """
+        fd, path = tempfile.mkstemp(dir=os.path.join(self.path, "tmp"))
+        os.close(fd)
+        return path
+
+    def put(self, key: str, temp: str, digest: str) -> str:
+        """
+        把下载好的临时文件放入缓存。内容已存在时删除临时文件。
+
+        Args:
+            key (str): 素材的键
+            temp (str): 临时文件路径
+            digest (str): 文件的 SHA-256 十六进制摘要
+
+        Returns:
+            str: 缓存中的文件路径
+        """
+        target = self.object_path(digest)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.exists(target):
+            os.remove(temp)
+        else:
+            os.replace(temp, target)
+        with self.__db:
+            self.__db.execute(
+                "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?)",
+                (key, digest, os.path.getsize(target), time.time()),
+            )
+        return target
+
+    def close(self):
+        """
+        关闭索引数据库。
+        """
+        self.__db.close()
+
+
+class _Asset:
+    name: str
+    path: str
+    md5: Optional[str]
+
+    def __init__(self, name: str, path: str, md5: Optional[str]):
+        self.name, self.path, self.md5 = name, path, md5
+
+    @property
+    def key(self) -> str:
+        return self.md5 if self.md5 != None else urlsplit(self.path).path
+
+
+def _entries(data: Any) -> Iterable[_Asset]:
+    # 素材列表的格式不固定：可能是字符串（URL 或路径），也可能是带 md5ext/url 等字段的对象。
+    if isinstance(data, str):
+        name = os.path.basename(urlsplit(data).path)
+        match = _MD5.match(name)
+        yield _Asset(name, data, None if match == None else match.group(1))
+    elif isinstance(data, list):
+        for i in data:
+            yield from _entries(i)
+    elif isinstance(data, dict):
+        path = next(
+            (data[k] for k in ("url", "md5ext", "path", "src") if data.get(k)), None
+        )
+        if isinstance(path, str):
+            name = os.path.basename(urlsplit(path).path)
+            match = _MD5.match(name)
+            md5 = None if match == None else match.group(1)
+            yield _Asset(name, path, md5)
+        else:
+            for value in data.values():
+                if isinstance(value, (list, dict)):
+                    yield from _entries(value)
+
+
+class AssetDownloader:
+    """
+    作品素材下载器：并发下载、流式写入磁盘，从最快的 CDN 下载并在失败时切换。
+    """
+
+    client: Client  # 客户端
+    cache: AssetCache  # 素材缓存
+    concurrency: int  # 最大并发下载数
+    chunk_size: int  # 每次写入的字节数
+    probe_timeout: float  # 测速的超时（秒）
+    timeout: aiohttp.ClientTimeout  # 下载的超时，不限制总时间，大文件可以持续传输
+    downloaded: int  # 下载的文件数
+    reused: int  # 从缓存中复用的文件数
+    bytes: int  # 下载的字节数
+    __ranking: dict[tuple[str, ...], list[str]]
+    __pending: dict[str, "asyncio.Task[str]"]
+
+    def __init__(
+        self,
+        client: Client,
+        cache: AssetCache,
+        concurrency: int = 8,
+        chunk_size: int = 65536,
+        probe_timeout: float = 3.0,
+        timeout: aiohttp.ClientTimeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=10, sock_read=30
+        ),
+    ):
+        """
+        初始化 AssetDownloader。
+
+        Args:
+            client (Client): 客户端
+            cache (AssetCache): 素材缓存
+            concurrency (int, optional): 最大并发下载数。默认为 8。
+            chunk_size (int, optional): 每次写入的字节数。默认为 65536。
+            probe_timeout (float, optional): CDN 测速的超时（秒）。默认为 3。
+            timeout (aiohttp.ClientTimeout, optional): 下载素材和素材列表的超时。默认不限制总时间，连接 10 秒，两次读取之间 30 秒。
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.client, self.cache = client, cache
+        self.concurrency, self.chunk_size = concurrency, chunk_size
+        self.probe_timeout, self.timeout = probe_timeout, timeout
+        self.downloaded = self.reused = self.bytes = 0
+        self.__ranking, self.__pending = {}, {}
+
+    async def rank(self, cdns: list[str], probe: str) -> list[str]:
+        """
+        对 CDN 测速，按响应时间排序。结果按 CDN 列表缓存。
+
+        Args:
+            cdns (list[str]): CDN 地址
+            probe (str): 用于测速的相对路径
+
+        Returns:
+            list[str]: 从快到慢的 CDN，无法访问的排在最后
+        """
+        key = tuple(cdns)
+        if key in self.__ranking:
+            return self.__ranking[key]
+
+        async def measure(cdn: str) -> float:
+            begin = time.monotonic()
+            try:
+                async with self.client.request(
+                    "HEAD",
+                    urljoin(cdn.rstrip("/") + "/", probe.lstrip("/")),
+                    timeout=aiohttp.ClientTimeout(total=self.probe_timeout),
+                ) as response:
+                    if response.status >= 400:
+                        return float("inf")
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return float("inf")
+            return time.monotonic() - begin
+
+        latency = await asyncio.gather(*(measure(i) for i in cdns))
+        ranking = [cdn for _, cdn in sorted(zip(latency, cdns), key=lambda i: i[0])]
+        self.__ranking[key] = ranking
+        return ranking
+
+    async def __stream(self, url: str, md5: Optional[str]) -> tuple[str, str]:
+        temp = self.cache.temp()
+        sha256, check = hashlib.sha256(), hashlib.md5()
+        try:
+            async with self.client.request(
+                "GET", url, timeout=self.timeout
+            ) as response:
+                if response.status != 200:
+                    raise APIException(f"HTTP {response.status}")
+                with open(temp, "wb") as f:
+                    async for chunk in response.content.iter_chunked(self.chunk_size):
+                        f.write(chunk)
+                        sha256.update(chunk)
+                        check.update(chunk)
+                        self.bytes += len(chunk)
+        except BaseException:
+            os.remove(temp)
+            raise
+        if md5 != None and check.hexdigest() != md5:
+            os.remove(temp)
+            raise APIException(f"MD5 mismatch: {url}")
+        return temp, sha256.hexdigest()
+
+    async def fetch(self, urls: list[str], key: str, md5: Optional[str] = None) -> str:
+        """
+        下载一个文件到缓存，依次尝试 urls 直到成功。同一个键同时只会下载一次。
+
+        Args:
+            urls (list[str]): 候选 URL，按优先顺序
+            key (str): 素材的键
+            md5 (Optional[str], optional): 期望的 MD5，用于校验。默认为 None。
+
+        Raises:
+            APIException: 所有 URL 都失败
+
+        Returns:
+            str: 缓存中的文件路径
+        """
+        path = self.cache.get(key)
+        if path != None:
+            self.reused += 1
+            return path
+        if key in self.__pending:
+            self.reused += 1
+            return await asyncio.shield(self.__pending[key])
+
+        async def download() -> str:
+            error: Optional[BaseException] = None
+            for url in urls:
+                try:
+                    temp, digest = await self.__stream(url, md5)
+                except (APIException, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = e
+                    continue
+                self.downloaded += 1
+                return self.cache.put(key, temp, digest)
+            raise APIException(f"download failed: {key} ({error})")
+
+        task = asyncio.ensure_future(download())
+        self.__pending[key] = task
+        task.add_done_callback(lambda _: self.__pending.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def download(self, data: Work_Data, directory: str) -> dict[str, str]:
+        """
+        下载作品的封面、音频、视频和素材到目录中。目录中的文件是缓存文件的硬链接（不支持时复制）。
+
+        Args:
+            data (Work_Data): 作品数据
+            directory (str): 输出目录
+
+        Raises:
+            APIException: 素材列表无法获得，或有文件下载失败
+
+        Returns:
+            dict[str, str]: {文件名: 路径}
+        """
+        assets: list[tuple[str, list[str], _Asset]] = []
+        for field in ("thumbnail", "audio", "video"):
+            url = data.get(field)
+            if isinstance(url, str) and url.startswith("http"):
+                ext = os.path.splitext(urlsplit(url).path)[1]
+                assets.append((field + ext, [url], _Asset(field + ext, url, None)))
+
+        info = data.get("asset") or {}
+        entries = list(_entries(info.get("asset") or []))
+        if info.get("assets_url"):
+            async with self.client.request(
+                "GET", info["assets_url"], timeout=self.timeout
+            ) as response:
+                if response.status != 200:
+                    raise APIException(f"HTTP {response.status}")
+                entries.extend(
+                    _entries(await response.json(loads=self.client.json_loads))
+                )
+        cdns = [i for i in info.get("cdn") or [] if isinstance(i, str)]
+        relative = [i for i in entries if not i.path.startswith("http")]
+        if cdns and relative:
+            cdns = await self.rank(cdns, relative[0].path)
+        seen: set[str] = set()
+        for entry in entries:
+            if entry.key in seen:
+                continue
+            seen.add(entry.key)
+            if entry.path.startswith("http"):
+                urls = [entry.path]
+            else:
+                urls = [
+                    urljoin(i.rstrip("/") + "/", entry.path.lstrip("/")) for i in cdns
+                ]
+            assets.append((entry.name, urls, entry))
+
+        os.makedirs(directory, exist_ok=True)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def one(name: str, urls: list[str], entry: _Asset) -> tuple[str, str]:
+            async with semaphore:
+                cached = await self.fetch(urls, entry.key, entry.md5)
+            target = os.path.join(directory, os.path.basename(name) or entry.key)
+            if os.path.exists(target):
+                os.remove(target)
+            try:
+                os.link(cached, target)
+            except OSError:
+                await asyncio.to_thread(shutil.copyfile, cached, target)
+            return name, target
+
+        # 等所有文件结束后再报告失败：已下载的文件会记入缓存，下次不必重新下载。
+        results = await asyncio.gather(
+            *(one(*i) for i in assets), return_exceptions=True
+        )
+        files: dict[str, str] = {}
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+            files[result[0]] = result[1]
+        return files
+
+    async def cancel(self):
+        """
+        取消并等待所有正在进行的下载。关闭缓存之前调用，避免下载完成后写入已关闭的缓存。
+        """
+        tasks = list(self.__pending.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,245 @@
+from typing import Optional
+from collections import OrderedDict
+from abc import ABC, abstractmethod
+import sqlite3
+import time
+
+
+class CacheEntry:
+    """
+    缓存的一条响应。
+    """
+
+    body: bytes  # 响应体
+    etag: Optional[str]  # ETag 响应头
+    last_modified: Optional[str]  # Last-Modified 响应头
+    stored: float  # 写入（或重新验证）的时间
+
+    def __init__(
+        self,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        stored: Optional[float] = None,
+    ):
+        """
+        初始化 CacheEntry。
+
+        Args:
+            body (bytes): 响应体
+            etag (Optional[str], optional): ETag 响应头。默认为 None。
+            last_modified (Optional[str], optional): Last-Modified 响应头。默认为 None。
+            stored (Optional[float], optional): 写入时间。默认为当前时间。
+        """
+        self.body, self.etag, self.last_modified = body, etag, last_modified
+        self.stored = time.time() if stored == None else stored
+
+    @property
+    def revalidatable(self) -> bool:
+        """
+        是否可以用条件请求重新验证。
+
+        Returns:
+            bool: 是否带有 ETag 或 Last-Modified
+        """
+        return self.etag != None or self.last_modified != None
+
+
+class Cache(ABC):
+    """
+    响应缓存的基类。子类实现 _load、_store 和 _delete 即可作为 Client 的缓存后端。
+    """
+
+    ttl: float  # 缓存有效期（秒）
+    hits: int  # 命中次数
+    misses: int  # 未命中次数
+    revalidated: int  # 过期后经条件请求确认未变化的次数
+
+    def __init__(self, ttl: float = 30.0):
+        """
+        初始化 Cache。
+
+        Args:
+            ttl (float, optional): 缓存有效期（秒）。默认为 30。
+        """
+        self.ttl = ttl
+        self.hits = self.misses = self.revalidated = 0
+
+    @abstractmethod
+    def _load(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _store(self, key: str, entry: CacheEntry):
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _delete(self, key: str):
+        raise NotImplementedError()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        获得缓存项（可能已过期，过期的项只用于重新验证）。
+
+        Args:
+            key (str): 键
+
+        Returns:
+            Optional[CacheEntry]: 缓存项
+        """
+        entry = self._load(key)
+        if entry != None and not self.fresh(entry) and not entry.revalidatable:
+            self._delete(key)
+            return None
+        return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        """
+        写入缓存项。
+
+        Args:
+            key (str): 键
+            entry (CacheEntry): 缓存项
+        """
+        self._store(key, entry)
+
+    def fresh(self, entry: CacheEntry) -> bool:
+        """
+        缓存项是否仍在有效期内。
+
+        Args:
+            entry (CacheEntry): 缓存项
+
+        Returns:
+            bool: 是否有效
+        """
+        return time.time() - entry.stored < self.ttl
+
+    def stats(self) -> dict[str, int]:
+        """
+        获得命中统计。
+
+        Returns:
+            dict[str, int]: hits、misses、revalidated
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+        }
+
+
+class MemoryCache(Cache):
+    """
+    内存 LRU 缓存。
+    """
+
+    maxsize: int  # 最多缓存的响应数
+    __entries: "OrderedDict[str, CacheEntry]"
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        """
+        初始化 MemoryCache。
+
+        Args:
+            maxsize (int, optional): 最多缓存的响应数。默认为 1024。
+            ttl (float, optional): 缓存有效期（秒）。默认为 30。
+        """
+        super().__init__(ttl)
+        self.maxsize = maxsize
+        self.__entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def _load(self, key: str) -> Optional[CacheEntry]:
+        entry = self.__entries.get(key)
+        if entry != None:
+            self.__entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, entry: CacheEntry):
+        self.__entries[key] = entry
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.maxsize:
+            self.__entries.popitem(last=False)
+
+    def _delete(self, key: str):
+        self.__entries.pop(key, None)
+
+
+class DiskCache(Cache):
+    """
+    基于 SQLite 的磁盘 LRU 缓存，可在进程重启后保留。
+    """
+
+    maxsize: int  # 最多缓存的响应数
+    __db: sqlite3.Connection
+
+    def __init__(self, path: str, maxsize: int = 65536, ttl: float = 30.0):
+        """
+        初始化 DiskCache。
+
+        Args:
+            path (str): 数据库文件路径
+            maxsize (int, optional): 最多缓存的响应数。默认为 65536。
+            ttl (float, optional): 缓存有效期（秒）。默认为 30。
+        """
+        super().__init__(ttl)
+        self.maxsize = maxsize
+        # SyncClient 在后台线程中使用缓存；所有访问都在同一个事件循环中进行。
+        self.__db = sqlite3.connect(path, check_same_thread=False)
+        self.__db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, body BLOB, etag TEXT, last_modified TEXT, "
+            "stored REAL, accessed REAL)"
+        )
+        self.__db.execute(
+            "CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)"
+        )
+        self.__db.commit()
+
+    def __len__(self) -> int:
+        return self.__db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def _load(self, key: str) -> Optional[CacheEntry]:
+        row = self.__db.execute(
+            "SELECT body, etag, last_modified, stored FROM cache WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row == None:
+            return None
+        self.__db.execute(
+            "UPDATE cache SET accessed = ? WHERE key = ?", (time.time(), key)
+        )
+        self.__db.commit()
+        return CacheEntry(row[0], row[1], row[2], row[3])
+
+    def _store(self, key: str, entry: CacheEntry):
+        self.__db.execute(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                entry.body,
+                entry.etag,
+                entry.last_modified,
+                entry.stored,
+                time.time(),
+            ),
+        )
+        self.__db.execute(
+            "DELETE FROM cache WHERE key IN ("
+            "SELECT key FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,),
+        )
+        self.__db.commit()
+
+    def _delete(self, key: str):
+        self.__db.execute("DELETE FROM cache WHERE key = ?", (key,))
+        self.__db.commit()
+
+    def close(self):
+        """
+        关闭数据库。
+        """
+        self.__db.close()
@@ -0,0 +1,483 @@
+from typing import Optional, Any, AsyncIterator, Callable, Union, TYPE_CHECKING
+from contextlib import asynccontextmanager
+from .cache import Cache, CacheEntry
+from .limit import RateLimiter, Retry, Hedge
+from .store import Store
+from .metrics import Metrics, endpoint
+from .deadline import Deadline, scope
+from .base import APIException
+from multidict import CIMultiDictProxy
+import hashlib
+import asyncio
+import aiohttp
+import json
+
+if TYPE_CHECKING:
+    from .user import User
+
+JSONLoads = Callable[[Union[bytes, str]], Any]
+
+try:
+    import orjson
+
+    _default_loads: JSONLoads = orjson.loads
+except ImportError:
+    try:
+        import ujson
+
+        _default_loads = ujson.loads
+    except ImportError:
+        _default_loads = json.loads
+
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=60, connect=10, sock_read=30)
+
+
+class _Flight:
+    task: "asyncio.Task[tuple[int, bytes]]"
+    waiters: int
+
+    def __init__(self, task: "asyncio.Task[tuple[int, bytes]]"):
+        self.task, self.waiters = task, 0
+
+
+class Client:
+    """
+    API 客户端，持有一个长期复用的连接池。
+
+    所有接口都可以传入同一个 Client，从而复用 TCP/TLS 连接。
+    未传入时，每次调用会临时创建一个 Client 并在调用结束后关闭。
+    """
+
+    base_url: str  # 学而思编程 API 地址
+    passport_url: str  # 好未来 passport 地址
+    login_url: str  # 学而思登录地址
+    cache: Optional[Cache]  # 响应缓存
+    limiter: Optional[RateLimiter]  # 全局限速
+    endpoint_limiters: dict[str, RateLimiter]  # 按接口限速，键为 endpoint() 的返回值
+    retry: Optional[Retry]  # 重试策略
+    json_loads: JSONLoads  # JSON 解码函数
+    store: Optional[Store]  # 本地数据存储
+    metrics: Optional[Metrics]  # 请求指标
+    single_flight: bool  # 是否合并同时进行的相同 GET 请求
+    coalesced: int  # 被合并、没有单独发出请求的调用数
+    timeout: aiohttp.ClientTimeout  # 默认的请求超时
+    hedge: Optional[Hedge]  # GET 请求的对冲策略
+    __flights: dict[str, _Flight]
+    __session: Optional[aiohttp.ClientSession]
+    __limit: int
+    __limit_per_host: int
+    __keepalive_timeout: float
+    __ttl_dns_cache: int
+
+    def __init__(
+        self,
+        base_url: str = "https://code.xueersi.com",
+        passport_url: str = "https://passport.100tal.com",
+        login_url: str = "https://login.xueersi.com",
+        limit: int = 100,
+        limit_per_host: int = 20,
+        keepalive_timeout: float = 60.0,
+        ttl_dns_cache: int = 300,
+        cache: Optional[Cache] = None,
+        limiter: Optional[RateLimiter] = None,
+        endpoint_limiters: Optional[dict[str, RateLimiter]] = None,
+        retry: Optional[Retry] = Retry(),
+        json_loads: Optional[JSONLoads] = None,
+        store: Optional[Store] = None,
+        metrics: Optional[Metrics] = None,
+        single_flight: bool = True,
+        timeout: aiohttp.ClientTimeout = DEFAULT_TIMEOUT,
+        hedge: Optional[Hedge] = None,
+    ):
+        """
+        初始化 Client。连接池在第一次请求时创建。
+
+        Args:
+            base_url (str, optional): 学而思编程 API 地址。默认为 "https://code.xueersi.com"。
+            passport_url (str, optional): 好未来 passport 地址。默认为 "https://passport.100tal.com"。
+            login_url (str, optional): 学而思登录地址。默认为 "https://login.xueersi.com"。
+            limit (int, optional): 连接池总连接数上限。默认为 100。
+            limit_per_host (int, optional): 单个主机的连接数上限。默认为 20。
+            keepalive_timeout (float, optional): 空闲连接保持时间（秒）。默认为 60。
+            ttl_dns_cache (int, optional): DNS 缓存时间（秒）。默认为 300。
+            cache (Optional[Cache], optional): 响应缓存，用于 get_work 和 User.info。默认为 None。
+            limiter (Optional[RateLimiter], optional): 所有请求共用的限速器。默认为 None。
+            endpoint_limiters (Optional[dict[str, RateLimiter]], optional): 按接口的限速器，如 {"/api/comments": RateLimiter(5)}。默认为 None。
+            retry (Optional[Retry], optional): 429、5xx 和超时时的重试策略，None 为不重试。默认为 Retry()。
+            json_loads (Optional[JSONLoads], optional): JSON 解码函数。默认依次使用已安装的 orjson、ujson 或标准库 json。
+            store (Optional[Store], optional): 本地数据存储，获得的作品、评论和回复会写入其中，足够新时直接从中读取。默认为 None。
+            metrics (Optional[Metrics], optional): 请求指标，记录所有经过此 Client 的请求。默认为 None。
+            single_flight (bool, optional): 是否合并同时进行的相同 GET 请求（同一路径、参数、请求头和用户），合并的调用共用一次请求的结果。默认为 True。
+            timeout (aiohttp.ClientTimeout, optional): 默认的请求超时（连接、读取和总时间），可在每次请求时用 timeout 参数覆盖。默认为 DEFAULT_TIMEOUT（总计 60 秒，连接 10 秒，读取 30 秒）。
+            hedge (Optional[Hedge], optional): GET 请求的对冲策略，按 metrics 记录的延迟决定何时发出重复请求；未传入 metrics 时自动创建。默认为 None。
+        """
+        self.base_url = base_url.rstrip("/")
+        self.passport_url = passport_url.rstrip("/")
+        self.login_url = login_url.rstrip("/")
+        self.cache = cache
+        self.limiter = limiter
+        self.endpoint_limiters = {} if endpoint_limiters == None else endpoint_limiters
+        self.retry = retry
+        self.json_loads = _default_loads if json_loads == None else json_loads
+        self.store = store
+        self.metrics = Metrics() if hedge != None and metrics == None else metrics
+        self.hedge = hedge
+        self.single_flight = single_flight
+        self.coalesced = 0
+        self.timeout = timeout
+        self.__flights = {}
+        self.__session = None
+        self.__limit = limit
+        self.__limit_per_host = limit_per_host
+        self.__keepalive_timeout = keepalive_timeout
+        self.__ttl_dns_cache = ttl_dns_cache
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        获得底层的 aiohttp 会话，不存在或已关闭时重新创建。
+
+        Returns:
+            aiohttp.ClientSession: 会话
+        """
+        if self.__session is None or self.__session.closed:
+            self.__session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.__limit,
+                    limit_per_host=self.__limit_per_host,
+                    keepalive_timeout=self.__keepalive_timeout,
+                    ttl_dns_cache=self.__ttl_dns_cache,
+                ),
+                # 不同用户共享同一个连接池，cookie 按请求传入，不在会话中保存。
+                cookie_jar=aiohttp.DummyCookieJar(),
+                timeout=self.timeout,
+                trace_configs=(
+                    None if self.metrics == None else [self.metrics.trace_config()]
+                ),
+            )
+        return self.__session
+
+    @property
+    def closed(self) -> bool:
+        """
+        连接池是否已关闭（或尚未创建）。
+
+        Returns:
+            bool: 是否已关闭
+        """
+        return self.__session is None or self.__session.closed
+
+    def url(self, path: str) -> str:
+        """
+        将 API 路径转换为完整 URL。
+
+        Args:
+            path (str): 以 / 开头的路径，或完整 URL
+
+        Returns:
+            str: 完整 URL
+        """
+        return self.base_url + path if path.startswith("/") else path
+
+    def endpoint(self, path: str) -> str:
+        """
+        获得路径对应的接口名：去掉主机和查询参数，数字段替换为 {id}。
+
+        Args:
+            path (str): 以 / 开头的路径，或完整 URL
+
+        Returns:
+            str: 接口名，如 "/api/compilers/v2/{id}"
+        """
+        return endpoint(path)
+
+    def request(
+        self, method: str, path: str, user: Optional["User"] = None, **kwargs: Any
+    ) -> Any:
+        """
+        发起请求，返回 aiohttp 的响应上下文管理器。
+
+        Args:
+            method (str): HTTP 方法
+            path (str): 以 / 开头的路径，或完整 URL
+            user (Optional[User], optional): 用户上下文。默认为 None。
+            **kwargs: 传递给 aiohttp 的其它参数
+
+        Returns:
+            Any: 响应上下文管理器，使用 async with 获得响应
+        """
+        if user is not None:
+            kwargs["cookies"] = {"xes_rfh": user.xes_rfh}
+        return self.session.request(method, self.url(path), **kwargs)
+
+    async def __send(
+        self, method: str, path: str, user: Optional["User"], kwargs: dict[str, Any]
+    ) -> tuple[int, "CIMultiDictProxy[str]", bytes]:
+        """
+        经过限速和重试发送请求。
+
+        Returns:
+            tuple[int, CIMultiDictProxy[str], bytes]: 状态码、响应头和响应体
+        """
+        limiters = [
+            limiter
+            for limiter in (
+                self.limiter,
+                self.endpoint_limiters.get(self.endpoint(path)),
+            )
+            if limiter != None
+        ]
+        attempt = 0
+        while True:
+            for limiter in limiters:
+                await limiter.acquire()
+            try:
+                status, headers, body = await self.__attempt(
+                    method, path, user, kwargs, limiters
+                )
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if self.retry == None or not self.retry.should_retry(
+                    method, None, attempt
+                ):
+                    raise
+                await asyncio.sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+            if self.retry == None or not self.retry.should_retry(
+                method, status, attempt
+            ):
+                return status, headers, body
+            delay = self.retry.delay(attempt, headers.get("Retry-After"))
+            if status == 429:
+                # 被限流时让所有共用限速器的请求一起等待，而不是各自撞上 429。
+                for limiter in limiters:
+                    limiter.pause(delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def __once(
+        self, method: str, path: str, user: Optional["User"], kwargs: dict[str, Any]
+    ) -> tuple[int, "CIMultiDictProxy[str]", bytes]:
+        async with self.request(method, path, user, **kwargs) as req:
+            return req.status, req.headers, await req.read()
+
+    async def __attempt(
+        self,
+        method: str,
+        path: str,
+        user: Optional["User"],
+        kwargs: dict[str, Any],
+        limiters: list[RateLimiter],
+    ) -> tuple[int, "CIMultiDictProxy[str]", bytes]:
+        """
+        发送一次请求。启用对冲时，GET 请求超过预计延迟仍未返回会再发一次，使用先成功返回的结果。
+
+        Returns:
+            tuple[int, CIMultiDictProxy[str], bytes]: 状态码、响应头和响应体
+        """
+        hedge, delay = self.hedge, None
+        if hedge != None and self.metrics != None and method == "GET":
+            hedge.requests += 1
+            delay = hedge.delay(self.metrics, self.endpoint(path))
+        if hedge == None or delay == None:
+            return await self.__once(method, path, user, kwargs)
+
+        async def backup() -> tuple[int, "CIMultiDictProxy[str]", bytes]:
+            # 对冲请求同样受限速约束。
+            for limiter in limiters:
+                await limiter.acquire()
+            return await self.__once(method, path, user, kwargs)
+
+        primary = asyncio.ensure_future(self.__once(method, path, user, kwargs))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done and hedge.allow():
+                hedge.hedged += 1
+                pending.add(asyncio.ensure_future(backup()))
+            errors: list[BaseException] = []
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    error = task.exception()
+                    if error == None:
+                        if task is not primary:
+                            hedge.wins += 1
+                        return task.result()
+                    # 都失败时抛出原请求的异常。
+                    errors.insert(0 if task is primary else len(errors), error)
+            raise errors[0]
+        finally:
+            # 取消较慢的请求，等待它结束以释放连接。
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def __decode(self, status: int, body: bytes) -> Any:
+        try:
+            return self.json_loads(body)
+        except ValueError:
+            if status >= 400:
+                raise APIException(f"HTTP {status}")
+            raise
+
+    async def fetch(
+        self,
+        method: str,
+        path: str,
+        user: Optional["User"] = None,
+        cache: bool = False,
+        deadline: Optional[Deadline] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        发起请求并解析 JSON 响应。请求会经过 Client 的限速与重试。
+
+        Args:
+            method (str): HTTP 方法
+            path (str): 以 / 开头的路径，或完整 URL
+            user (Optional[User], optional): 用户上下文。默认为 None。
+            cache (bool, optional): 是否使用 Client 的响应缓存（仅限 GET）。默认为 False。
+            deadline (Optional[Deadline], optional): 截止时间，包括限速等待和重试。默认为 None。
+            **kwargs: 传递给 aiohttp 的其它参数，如 timeout=aiohttp.ClientTimeout(...)
+
+        Raises:
+            APIException: 响应不是 JSON 且状态码表示错误
+            TimeoutError: 超时或超过截止时间
+
+        Returns:
+            Any: 解析后的 JSON
+        """
+        if not self.single_flight or method != "GET":
+            async with scope(deadline):
+                status, body = await self.__fetch(method, path, user, cache, kwargs)
+            return self.__decode(status, body)
+        # 合并的调用共用第一个调用的 timeout 参数，但各自按自己的 deadline 等待。
+        # 不使用缓存的调用（如 User.validate）不能拿到使用缓存的调用的结果。
+        key = self.__cache_key(method, path, user, kwargs.get("params"))
+        key += f" {kwargs.get('headers')!r} {cache}"
+        flight = self.__flights.get(key)
+        if flight == None:
+            flight = _Flight(
+                asyncio.ensure_future(self.__fetch(method, path, user, cache, kwargs))
+            )
+            self.__flights[key] = flight
+
+            def done(task: "asyncio.Task[tuple[int, bytes]]"):
+                if self.__flights.get(key) is flight:
+                    del self.__flights[key]
+                # 所有调用方都被取消时，没有人读取异常，这里读取以免 asyncio 报警告。
+                if not task.cancelled():
+                    task.exception()
+
+            flight.task.add_done_callback(done)
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            # 调用方被取消时不取消共用的请求，其它调用方仍在等待它。
+            async with scope(deadline):
+                status, body = await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # 所有调用方都已放弃，取消请求以释放连接。
+                if self.__flights.get(key) is flight:
+                    del self.__flights[key]
+                flight.task.cancel()
+        # 每个调用方各自解码，避免共用同一个可变对象。
+        return self.__decode(status, body)
+
+    async def __fetch(
+        self,
+        method: str,
+        path: str,
+        user: Optional["User"],
+        cache: bool,
+        kwargs: dict[str, Any],
+    ) -> tuple[int, bytes]:
+        """
+        经过缓存发送请求。
+
+        Returns:
+            tuple[int, bytes]: 状态码和响应体
+        """
+        if not cache or self.cache == None or method != "GET":
+            status, _, body = await self.__send(method, path, user, kwargs)
+            return status, body
+        key = self.__cache_key(method, path, user, kwargs.get("params"))
+        entry = self.cache.get(key)
+        if entry != None and self.cache.fresh(entry):
+            self.cache.hits += 1
+            return 200, entry.body
+        if entry != None:
+            headers = dict(kwargs.get("headers") or {})
+            if entry.etag != None:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified != None:
+                headers["If-Modified-Since"] = entry.last_modified
+            kwargs = kwargs | {"headers": headers}
+        status, headers, body = await self.__send(method, path, user, kwargs)
+        if status == 304 and entry != None:
+            self.cache.revalidated += 1
+            self.cache.set(key, CacheEntry(entry.body, entry.etag, entry.last_modified))
+            return 200, entry.body
+        self.cache.misses += 1
+        # 只缓存成功的响应，API 错误（如作品不存在）每次都重新请求。
+        if status == 200:
+            try:
+                data = self.json_loads(body)
+            except ValueError:
+                data = None
+            if isinstance(data, dict) and data.get("stat") == 1:
+                self.cache.set(
+                    key,
+                    CacheEntry(body, headers.get("ETag"), headers.get("Last-Modified")),
+                )
+        return status, body
+
+    def __cache_key(
+        self, method: str, path: str, user: Optional["User"], params: Any
+    ) -> str:
+        # 用 xes_rfh 的摘要区分用户，避免把凭据写进磁盘缓存。
+        identity = (
+            ""
+            if user == None
+            else hashlib.sha256(str(user.xes_rfh).encode()).hexdigest()[:16]
+        )
+        return f"{method} {self.url(path)} {params!r} {identity}"
+
+    async def close(self):
+        """
+        关闭连接池。
+        """
+        if self.__session is not None and not self.__session.closed:
+            await self.__session.close()
+        self.__session = None
+
+    async def __aenter__(self) -> "Client":
+        return self
+
+    async def __aexit__(self, *_: Any):
+        await self.close()
+
+
+@asynccontextmanager
+async def _use_client(client: Optional[Client]) -> AsyncIterator[Client]:
+    """
+    使用给定的 Client；未给定时创建一个临时 Client，并在结束后关闭。
+
+    Args:
+        client (Optional[Client]): 客户端
+
+    Returns:
+        AsyncIterator[Client]: 客户端上下文
+    """
+    if client is not None:
+        yield client
+    else:
+        async with Client() as temp:
+            yield temp
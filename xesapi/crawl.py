@@ -0,0 +1,259 @@
+from typing import Optional, Callable, Iterator, Any
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import deque
+from contextlib import aclosing
+from .client import Client
+from .user import User
+from .work import Work, get_works
+from .base import APIException
+import asyncio
+import aiohttp
+import hashlib
+import pickle
+import shutil
+import json
+import time
+import os
+
+
+class CrawlProgress:
+    """
+    爬取进度，每完成一个分片更新一次。
+    """
+
+    shards: int  # 分片总数
+    done: int  # 已完成的分片数（包括之前运行中完成的）
+    works: int  # 获得的作品数
+    comments: int  # 获得的评论数
+    missing: int  # 不存在或无权访问的作品数
+    errors: int  # 网络错误等失败的作品数（包括评论获取失败的作品）
+    elapsed: float  # 本次运行的耗时（秒）
+
+    def __init__(self, shards: int):
+        """
+        初始化 CrawlProgress。
+
+        Args:
+            shards (int): 分片总数
+        """
+        self.shards = shards
+        self.done = self.works = self.comments = self.missing = self.errors = 0
+        self.elapsed = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"<CrawlProgress {self.done}/{self.shards} works={self.works} "
+            f"comments={self.comments} missing={self.missing} errors={self.errors}>"
+        )
+
+
+def _shards(start: int, stop: int, size: int) -> Iterator[tuple[int, int]]:
+    for i in range(start, stop, size):
+        yield i, min(i + size, stop)
+
+
+async def _crawl(
+    start: int,
+    stop: int,
+    path: str,
+    concurrency: int,
+    comments: bool,
+    user: Optional[str],
+    options: dict[str, Any],
+) -> dict[str, int]:
+    counts = {"works": 0, "comments": 0, "missing": 0, "errors": 0}
+    async with Client(**options) as client:
+        owner = None if user == None else User.loads(user, client)
+
+        async def expand(work: Work) -> dict[str, Any]:
+            record: dict[str, Any] = {"work": work.data}
+            if comments:
+                try:
+                    record["comments"] = [
+                        i.data async for i in work.comment(per_page="auto")
+                    ]
+                except (
+                    APIException,
+                    aiohttp.ClientError,
+                    asyncio.TimeoutError,
+                    ValueError,
+                ) as e:
+                    # 评论获取失败（如评论区已关闭、响应不是 JSON）时仍保存作品，不中断整个分片。
+                    record["error"] = (
+                        e.what
+                        if isinstance(e, APIException)
+                        else str(e) or e.__class__.__name__
+                    )
+            return record
+
+        with open(path, "w", encoding="utf-8") as out:
+
+            def write(record: dict[str, Any]):
+                counts["works"] += 1
+                counts["comments"] += len(record.get("comments", ()))
+                if "error" in record:
+                    counts["errors"] += 1
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+            window: deque[asyncio.Task[dict[str, Any]]] = deque()
+            works = get_works(range(start, stop), owner, client, concurrency)
+            try:
+                async with aclosing(works) as iterator:
+                    async for _, work in iterator:
+                        if isinstance(work, APIException):
+                            counts["missing"] += 1
+                            continue
+                        if isinstance(work, Exception):
+                            counts["errors"] += 1
+                            continue
+                        window.append(asyncio.ensure_future(expand(work)))
+                        while window and (
+                            len(window) > concurrency or window[0].done()
+                        ):
+                            write(await window.popleft())
+                while window:
+                    write(await window.popleft())
+            finally:
+                for task in window:
+                    task.cancel()
+                if window:
+                    await asyncio.gather(*window, return_exceptions=True)
+    return counts
+
+
+def _crawl_shard(task: dict[str, Any]) -> dict[str, int]:
+    # 在子进程中运行：每个进程有自己的事件循环和连接池。
+    temp = task["path"] + ".tmp"
+    try:
+        counts = asyncio.run(
+            _crawl(
+                task["start"],
+                task["stop"],
+                temp,
+                task["concurrency"],
+                task["comments"],
+                task["user"],
+                task["options"],
+            )
+        )
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+    os.replace(temp, task["path"])
+    # 分片的统计信息写在旁边，写入后该分片才算完成。
+    with open(task["path"] + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(counts, f)
+    os.replace(task["path"] + ".tmp", task["path"][: -len(".ndjson")] + ".json")
+    return counts
+
+
+def crawl(
+    start: int,
+    stop: int,
+    path: str,
+    processes: Optional[int] = None,
+    shard_size: int = 1000,
+    concurrency: int = 10,
+    comments: bool = False,
+    user: Optional[User] = None,
+    progress: Optional[Callable[[CrawlProgress], Any]] = None,
+    **options: Any,
+) -> CrawlProgress:
+    """
+    用多个进程爬取 [start, stop) 范围内的作品（以及评论），结果按作品id顺序合并为一个 NDJSON 文件。
+
+    每行为 {"work": 作品数据}，comments 为 True 时还有 "comments": [评论数据]；
+    评论获取失败的作品没有 "comments"，而是 "error": 错误信息，并计入 errors。
+    id 范围被切成大小为 shard_size 的分片，完成的分片保存在 path + ".shards" 目录中；
+    中断后以相同的参数再次调用，会跳过已完成的分片，全部完成后合并并删除该目录；
+    参数（包括 comments、是否有 user 和 options）不同时，已完成的分片会被丢弃。
+
+    Args:
+        start (int): 起始作品id
+        stop (int): 结束作品id（不包含）
+        path (str): 输出文件路径
+        processes (Optional[int], optional): 进程数。默认为 CPU 核数。
+        shard_size (int, optional): 每个分片的作品数。默认为 1000。
+        concurrency (int, optional): 每个进程的并发请求数。默认为 10。
+        comments (bool, optional): 是否同时获得评论。默认为 False。
+        user (Optional[User], optional): 用户上下文，通过 User.dumps 传给子进程。默认为 None。
+        progress (Optional[Callable[[CrawlProgress], Any]], optional): 每完成一个分片调用一次。默认为 None。
+        **options (Any): 子进程中创建 Client 的参数（如 base_url、limit_per_host），必须可以 pickle。
+
+    Returns:
+        CrawlProgress: 最终的统计信息
+    """
+    if shard_size < 1:
+        raise ValueError("shard_size must be at least 1")
+    directory = path + ".shards"
+    state_path = os.path.join(directory, "state.json")
+    # 影响分片内容的参数都记录下来；options 必须可以 pickle，用其摘要比较。
+    state = {
+        "start": start,
+        "stop": stop,
+        "shard_size": shard_size,
+        "comments": comments,
+        "user": user != None,
+        "options": hashlib.sha256(pickle.dumps(sorted(options.items()))).hexdigest(),
+    }
+    if os.path.exists(state_path):
+        with open(state_path, "r", encoding="utf-8") as f:
+            if json.load(f) != state:
+                # 参数变了，之前的分片不能再用。
+                shutil.rmtree(directory)
+    os.makedirs(directory, exist_ok=True)
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    shards = list(_shards(start, stop, shard_size))
+    shard_path = lambda i, ext: os.path.join(directory, f"{i:08d}.{ext}")
+    done: dict[int, dict[str, int]] = {}
+    for i in range(len(shards)):
+        if os.path.exists(shard_path(i, "json")):
+            with open(shard_path(i, "json"), "r", encoding="utf-8") as f:
+                done[i] = json.load(f)
+
+    result = CrawlProgress(len(shards))
+    for counts in done.values():
+        result.done += 1
+        for key in ("works", "comments", "missing", "errors"):
+            setattr(result, key, getattr(result, key) + counts[key])
+    begin = time.monotonic()
+    dumped = None if user == None else user.dumps()
+    tasks = [
+        {
+            "start": lo,
+            "stop": hi,
+            "path": shard_path(i, "ndjson"),
+            "concurrency": concurrency,
+            "comments": comments,
+            "user": dumped,
+            "options": options,
+        }
+        for i, (lo, hi) in enumerate(shards)
+        if i not in done
+    ]
+    if tasks:
+        with ProcessPoolExecutor(processes) as executor:
+            futures = [executor.submit(_crawl_shard, task) for task in tasks]
+            try:
+                for future in as_completed(futures):
+                    counts = future.result()
+                    result.done += 1
+                    for key in ("works", "comments", "missing", "errors"):
+                        setattr(result, key, getattr(result, key) + counts[key])
+                    result.elapsed = time.monotonic() - begin
+                    if progress != None:
+                        progress(result)
+            except BaseException:
+                # 不再开始新的分片；正在运行的分片会完成并保存，下次调用时跳过。
+                executor.shutdown(cancel_futures=True)
+                raise
+
+    with open(path, "wb") as out:
+        for i in range(len(shards)):
+            with open(shard_path(i, "ndjson"), "rb") as f:
+                shutil.copyfileobj(f, out)
+    shutil.rmtree(directory)
+    result.elapsed = time.monotonic() - begin
+    return result
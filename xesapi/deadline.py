@@ -0,0 +1,99 @@
+from typing import Optional, Any
+import asyncio
+import time
+
+
+class Deadline:
+    """
+    截止时间，用于限制由多个请求组成的操作（翻页、登录等）的总耗时。
+
+    同一个 Deadline 可以传给多个调用，它们共用剩余的时间。超过截止时间的请求会被取消，
+    占用的连接随之释放，调用抛出 TimeoutError。
+    """
+
+    at: float  # 截止时刻（time.monotonic）
+
+    def __init__(self, seconds: float):
+        """
+        初始化 Deadline。
+
+        Args:
+            seconds (float): 从现在起的秒数
+        """
+        self.at = time.monotonic() + seconds
+
+    @property
+    def remaining(self) -> float:
+        """
+        获得剩余的秒数，已超过时为 0。
+
+        Returns:
+            float: 剩余秒数
+        """
+        return max(0.0, self.at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """
+        是否已超过截止时间。
+
+        Returns:
+            bool: 是否已超过
+        """
+        return time.monotonic() >= self.at
+
+    def __repr__(self) -> str:
+        return f"<Deadline remaining={self.remaining:.3f}s>"
+
+
+class _Scope:
+    # asyncio.timeout 需要 Python 3.11，这里用定时取消实现同样的效果。
+    __delay: Optional[float]
+    __task: "Optional[asyncio.Task[Any]]"
+    __handle: Optional[asyncio.TimerHandle]
+    __expired: bool
+
+    def __init__(self, delay: Optional[float]):
+        self.__delay, self.__task, self.__handle = delay, None, None
+        self.__expired = False
+
+    def __expire(self):
+        self.__expired = True
+        if self.__task != None:
+            self.__task.cancel()
+
+    async def __aenter__(self) -> "_Scope":
+        if self.__delay != None:
+            self.__task = asyncio.current_task()
+            self.__handle = asyncio.get_running_loop().call_later(
+                self.__delay, self.__expire
+            )
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        _: Any,
+    ) -> None:
+        if self.__handle != None:
+            self.__handle.cancel()
+        if self.__expired and exc_type is asyncio.CancelledError:
+            if self.__task != None and hasattr(self.__task, "uncancel"):
+                self.__task.uncancel()
+            raise asyncio.TimeoutError from exc
+
+
+def scope(deadline: Optional[Deadline]) -> _Scope:
+    """
+    获得在截止时间取消当前任务的上下文管理器，用 async with 包住要限制的代码。
+
+    不能跨越异步生成器的 yield 使用，生成器应把 deadline 传给每一次请求。
+
+    Args:
+        deadline (Optional[Deadline]): 截止时间，None 为不限制
+
+    Returns:
+        _Scope: 上下文管理器，超时时抛出 asyncio.TimeoutError
+    """
+    return _Scope(None if deadline == None else deadline.remaining)
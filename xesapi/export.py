@@ -0,0 +1,154 @@
+from typing import Literal, Iterator, AsyncGenerator, Any
+from contextlib import aclosing
+from .type import Comment_Data, Reply_Data
+from .work import Work, Comment, _expand
+import json
+import gzip
+import os
+
+COMMENT_FIELDS = tuple(k for k in Comment_Data.__annotations__ if k != "reply_list")
+REPLY_FIELDS = tuple(Reply_Data.__annotations__)
+# 列式文件中每一行的字段：kind 为 "comment" 或 "reply"，其余为两种数据的并集。
+COLUMNS = (
+    ("kind",)
+    + COMMENT_FIELDS
+    + tuple(k for k in REPLY_FIELDS if k not in COMMENT_FIELDS)
+)
+
+ExportFormat = Literal["ndjson", "columnar"]
+
+
+def _comment_row(data: Comment_Data) -> dict[str, Any]:
+    row: dict[str, Any] = {"kind": "comment"}
+    for key in COMMENT_FIELDS:
+        row[key] = data.get(key)
+    return row
+
+
+def _reply_row(data: Reply_Data) -> dict[str, Any]:
+    row: dict[str, Any] = {"kind": "reply"}
+    for key in REPLY_FIELDS:
+        row[key] = data.get(key)
+    return row
+
+
+def _encode_chunk(rows: list[dict[str, Any]], format: ExportFormat) -> bytes:
+    if format == "ndjson":
+        return b"".join(
+            json.dumps(row, ensure_ascii=False).encode() + b"\n" for row in rows
+        )
+    # 每个块是一个独立的 gzip 成员，文件可以在任意块边界截断后继续追加。
+    columns = {key: [row.get(key) for row in rows] for key in COLUMNS}
+    return gzip.compress(
+        json.dumps(
+            {"rows": len(rows), "columns": columns},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode()
+        + b"\n"
+    )
+
+
+async def export_comments(
+    work: Work,
+    path: str,
+    format: ExportFormat = "ndjson",
+    chunk_size: int = 1000,
+    concurrency: int = 4,
+    per_page: int = 15,
+    resume: bool = True,
+) -> int:
+    """
+    将作品的全部评论和回复流式导出到文件，内存占用只与 chunk_size 有关。
+
+    每写完一块就在 path + ".ckpt" 记录进度；中断后再次调用会从上次的进度继续，完成后删除进度文件。
+    导出期间有新评论时，继续导出可能会产生少量重复行。
+
+    Args:
+        work (Work): 作品
+        path (str): 输出文件路径
+        format (ExportFormat, optional): "ndjson" 为每行一条记录；"columnar" 为按块压缩的列式格式，用 read_columnar 读取。默认为 "ndjson"。
+        chunk_size (int, optional): 每块的最少行数。默认为 1000。
+        concurrency (int, optional): 同时展开回复的评论数。默认为 4。
+        per_page (int, optional): 评论列表每页数量。默认为 15。
+        resume (bool, optional): 存在进度文件时是否继续。为 False 时重新导出。默认为 True。
+
+    Raises:
+        APIException: API 错误
+
+    Returns:
+        int: 文件中的总行数
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    checkpoint = path + ".ckpt"
+    state = {
+        "comments": 0,
+        "rows": 0,
+        "offset": 0,
+        "per_page": per_page,
+        "format": format,
+    }
+    if resume and os.path.exists(checkpoint) and os.path.exists(path):
+        with open(checkpoint, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        # 每页数量或格式不同时，之前的进度不能再用。
+        if saved["per_page"] == per_page and saved.get("format") == format:
+            state = saved
+    start, skip = divmod(state["comments"], per_page)
+    rows: list[dict[str, Any]] = []
+    with open(path, "r+b" if state["offset"] > 0 else "wb") as out:
+        # 丢弃上次中断时写了一半、没有记录进度的块。
+        out.truncate(state["offset"])
+        out.seek(state["offset"])
+
+        def flush():
+            if not rows:
+                return
+            out.write(_encode_chunk(rows, format))
+            out.flush()
+            state["rows"] += len(rows)
+            state["offset"] = out.tell()
+            rows.clear()
+            with open(checkpoint + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(checkpoint + ".tmp", checkpoint)
+
+        async def remaining() -> AsyncGenerator[Comment, Any]:
+            # 在展开回复之前跳过已导出的评论，避免为它们请求回复。
+            count = skip
+            async with aclosing(
+                work.comment(per_page=per_page, start=start + 1)
+            ) as comments:
+                async for comment in comments:
+                    if count > 0:
+                        count -= 1
+                        continue
+                    yield comment
+
+        async with aclosing(_expand(remaining(), concurrency)) as thread:
+            async for comment, replies in thread:
+                rows.append(_comment_row(comment.data))
+                rows.extend(_reply_row(i.data) for i in replies)
+                state["comments"] += 1
+                if len(rows) >= chunk_size:
+                    flush()
+        flush()
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return state["rows"]
+
+
+def read_columnar(path: str) -> Iterator[dict[str, list[Any]]]:
+    """
+    逐块读取 export_comments 写出的列式文件。
+
+    Args:
+        path (str): 文件路径
+
+    Returns:
+        Iterator[dict[str, list[Any]]]: 每块的 {列名: 值列表}
+    """
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            yield json.loads(line)["columns"]
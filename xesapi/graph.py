@@ -0,0 +1,269 @@
+from typing import Optional, Union, Iterable, Literal, AsyncIterable, Any
+from collections import Counter
+from contextlib import aclosing
+from array import array
+from bisect import bisect_left
+from .type import Comment_Data, Reply_Data
+from .work import Work, Comment, Reply
+
+Item = Union[Comment, Reply, Comment_Data, Reply_Data]
+
+
+class CommentGraph:
+    """
+    列式存储的评论与回复，用于大量数据的统计分析。
+
+    每一列是一个 array，用户 ID 驻留为整数编号，不为每一行保存 Python 对象。
+    评论的 parent 和 target 为 0；回复的 parent 为所属评论，target 为回复的评论或回复。
+    """
+
+    id: "array[int]"  # 评论或回复 id
+    parent: "array[int]"  # 所属评论 id，评论为 0
+    target: "array[int]"  # 回复目标 id，评论为 0
+    user: "array[int]"  # 作者编号，对应 users
+    reply_user: "array[int]"  # 回复目标作者编号，评论为 -1
+    likes: "array[int]"  # 赞数
+    users: list[str]  # 用户 ID，下标为编号
+    __index: dict[str, int]
+
+    def __init__(self, items: Iterable[Item] = ()):
+        """
+        初始化 CommentGraph。
+
+        Args:
+            items (Iterable[Item], optional): 评论或回复（对象或数据）。默认为空。
+        """
+        self.id, self.parent, self.target = array("q"), array("q"), array("q")
+        self.user, self.reply_user = array("l"), array("l")
+        self.likes = array("q")
+        self.users, self.__index = [], {}
+        self.extend(items)
+
+    def __intern(self, user_id: Any) -> int:
+        if user_id == None:
+            return -1
+        key = str(user_id)
+        index = self.__index.get(key)
+        if index == None:
+            index = self.__index[key] = len(self.users)
+            self.users.append(key)
+        return index
+
+    def add(self, item: Item):
+        """
+        添加一条评论或回复。评论自带的回复不会一并添加。
+
+        Args:
+            item (Item): 评论或回复（对象或数据）
+        """
+        data: Any = item.data if isinstance(item, (Comment, Reply)) else item
+        self.id.append(data["id"])
+        self.parent.append(data.get("parent_id") or 0)
+        self.target.append(data.get("target_id") or 0)
+        self.user.append(self.__intern(data.get("user_id")))
+        self.reply_user.append(self.__intern(data.get("reply_user_id")))
+        self.likes.append(data.get("likes") or 0)
+
+    def extend(self, items: Iterable[Item]):
+        """
+        添加多条评论或回复。
+
+        Args:
+            items (Iterable[Item]): 评论或回复（对象或数据）
+        """
+        for i in items:
+            self.add(i)
+
+    async def ingest(self, items: AsyncIterable[Item]) -> int:
+        """
+        从异步生成器（如 Work.comment、Comment.reply）中添加数据。
+
+        Args:
+            items (AsyncIterable[Item]): 评论或回复
+
+        Returns:
+            int: 添加的行数
+        """
+        count = 0
+        async for i in items:
+            self.add(i)
+            count += 1
+        return count
+
+    async def ingest_work(
+        self, work: Work, concurrency: int = 4, per_page: int = 15
+    ) -> int:
+        """
+        添加作品的全部评论和回复。回复的请求与评论列表的翻页同时进行。
+
+        Args:
+            work (Work): 作品
+            concurrency (int, optional): 同时展开回复的评论数。默认为 4。
+            per_page (int, optional): 评论列表每页数量。默认为 15。
+
+        Raises:
+            APIException: API 错误
+
+        Returns:
+            int: 添加的行数
+        """
+        count = 0
+        async with aclosing(work.thread(concurrency, per_page=per_page)) as thread:
+            async for comment, replies in thread:
+                self.add(comment)
+                self.extend(replies)
+                count += 1 + len(replies)
+        return count
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        获得各列占用的字节数（不包括用户 ID 字符串）。
+
+        Returns:
+            int: 字节数
+        """
+        columns = (
+            self.id,
+            self.parent,
+            self.target,
+            self.user,
+            self.reply_user,
+            self.likes,
+        )
+        return sum(i.itemsize * len(i) for i in columns)
+
+    def top_users(
+        self,
+        n: int = 10,
+        by: Literal["count", "likes"] = "count",
+        kind: Optional[Literal["comment", "reply"]] = None,
+    ) -> list[tuple[str, int]]:
+        """
+        获得发言最多（或获赞最多）的用户。
+
+        Args:
+            n (int, optional): 数量。默认为 10。
+            by (Literal["count", "likes"], optional): "count" 按条数，"likes" 按获赞总数。默认为 "count"。
+            kind (Optional[Literal["comment", "reply"]], optional): 只统计评论或回复。默认为全部。
+
+        Returns:
+            list[tuple[str, int]]: (用户 ID, 数值)，从大到小
+        """
+        if kind == None and by == "count":
+            counter = Counter(self.user)
+        else:
+            counter = Counter()
+            for user, parent, likes in zip(self.user, self.parent, self.likes):
+                if kind == "comment" and parent != 0 or kind == "reply" and parent == 0:
+                    continue
+                counter[user] += likes if by == "likes" else 1
+        return [(self.users[i], value) for i, value in counter.most_common(n)]
+
+    def like_histogram(
+        self, bins: Iterable[int] = (0, 1, 2, 5, 10, 20, 50, 100, 1000)
+    ) -> dict[str, int]:
+        """
+        获得赞数的分布。
+
+        Args:
+            bins (Iterable[int], optional): 各区间的下界，从小到大。默认为 (0, 1, 2, 5, 10, 20, 50, 100, 1000)。
+
+        Returns:
+            dict[str, int]: {区间: 条数}，如 {"0": 10, "1": 3, "2-4": 5, ..., "1000+": 1}
+        """
+        bounds = sorted(bins)
+        counts = Counter(self.likes)
+        result = [0] * len(bounds)
+        for likes, count in counts.items():
+            index = bisect_left(bounds, likes + 1) - 1
+            if index >= 0:
+                result[index] += count
+        labels = []
+        for i, low in enumerate(bounds):
+            if i + 1 == len(bounds):
+                labels.append(f"{low}+")
+            elif bounds[i + 1] - 1 == low:
+                labels.append(str(low))
+            else:
+                labels.append(f"{low}-{bounds[i + 1] - 1}")
+        return dict(zip(labels, result))
+
+    def reply_depth(self) -> dict[int, int]:
+        """
+        获得回复深度的分布。直接回复评论的深度为 1，回复深度为 d 的回复的深度为 d + 1。
+
+        回复目标不在数据中时视为直接回复评论。
+
+        Returns:
+            dict[int, int]: {深度: 回复数}
+        """
+        depth: dict[int, int] = {}
+        pending: list[int] = []
+        rows = {id: row for row, id in enumerate(self.id)}
+        for row, (id, parent) in enumerate(zip(self.id, self.parent)):
+            if parent == 0:
+                continue
+            # 沿回复链向上找到已知深度的祖先，再依次回填。
+            chain, current = [], row
+            while True:
+                current_id, current_target = self.id[current], self.target[current]
+                if current_id in depth:
+                    base = depth[current_id]
+                    break
+                chain.append(current_id)
+                up = rows.get(current_target)
+                if (
+                    current_target == self.parent[current]
+                    or up == None
+                    or up == current
+                ):
+                    base = 0
+                    break
+                current = up
+                if len(chain) > len(rows):
+                    # 数据有环时停止，避免死循环。
+                    base = 0
+                    break
+            for i in reversed(chain):
+                base += 1
+                depth[i] = base
+            pending.append(id)
+        return dict(sorted(Counter(depth[i] for i in pending).items()))
+
+    def replies_per_comment(self, n: Optional[int] = None) -> list[tuple[int, int]]:
+        """
+        获得回复最多的评论。
+
+        Args:
+            n (Optional[int], optional): 数量。默认为全部。
+
+        Returns:
+            list[tuple[int, int]]: (评论 id, 回复数)，从大到小
+        """
+        counter = Counter(self.parent)
+        counter.pop(0, None)
+        return counter.most_common(n)
+
+    def interactions(self, n: int = 10) -> list[tuple[str, str, int]]:
+        """
+        获得回复次数最多的用户对。
+
+        Args:
+            n (int, optional): 数量。默认为 10。
+
+        Returns:
+            list[tuple[str, str, int]]: (回复者 ID, 被回复者 ID, 次数)，从大到小
+        """
+        counter = Counter(
+            (user, target)
+            for user, target in zip(self.user, self.reply_user)
+            if target >= 0
+        )
+        return [
+            (self.users[a], self.users[b], count)
+            for (a, b), count in counter.most_common(n)
+        ]
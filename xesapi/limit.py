@@ -0,0 +1,213 @@
+from typing import Optional, Iterable, TYPE_CHECKING
+import email.utils
+import asyncio
+import random
+import time
+
+if TYPE_CHECKING:
+    from .metrics import Metrics
+
+
+class RateLimiter:
+    """
+    令牌桶限速器。
+    """
+
+    rate: float  # 每秒产生的令牌数
+    burst: float  # 桶容量
+    __tokens: float
+    __updated: float
+    __lock: Optional[asyncio.Lock]
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        初始化限速器。
+
+        Args:
+            rate (float): 每秒允许的请求数
+            burst (Optional[float], optional): 允许的突发请求数。默认与 rate 相同（至少为 1）。
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1.0, rate if burst == None else burst)
+        self.__tokens = self.burst
+        self.__updated = time.monotonic()
+        self.__lock = None
+
+    def __refill(self):
+        now = time.monotonic()
+        self.__tokens = min(
+            self.burst, self.__tokens + (now - self.__updated) * self.rate
+        )
+        self.__updated = now
+
+    async def acquire(self):
+        """
+        获取一个令牌，令牌不足时等待。
+        """
+        if self.__lock == None:
+            self.__lock = asyncio.Lock()
+        # 加锁保证等待者按先来后到获得令牌。
+        async with self.__lock:
+            self.__refill()
+            # 等待期间可能被 pause，醒来后重新检查。
+            while self.__tokens < 1:
+                await asyncio.sleep((1 - self.__tokens) / self.rate)
+                self.__refill()
+            self.__tokens -= 1
+
+    def pause(self, seconds: float):
+        """
+        暂停发放令牌一段时间，用于服务器要求降速（如 429 Retry-After）时。
+
+        Args:
+            seconds (float): 暂停时间（秒）
+        """
+        self.__refill()
+        self.__tokens = min(self.__tokens, 1 - seconds * self.rate)
+
+
+class Retry:
+    """
+    失败重试策略：带随机抖动的指数退避。
+    """
+
+    attempts: int  # 最多重试次数
+    base: float  # 第一次重试的基础等待时间（秒）
+    cap: float  # 单次等待的上限（秒）
+    statuses: frozenset[int]  # 需要重试的 HTTP 状态码
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base: float = 0.5,
+        cap: float = 30.0,
+        statuses: Iterable[int] = (429, 500, 502, 503, 504),
+    ):
+        """
+        初始化重试策略。
+
+        Args:
+            attempts (int, optional): 最多重试次数。默认为 3。
+            base (float, optional): 第一次重试的基础等待时间（秒）。默认为 0.5。
+            cap (float, optional): 单次等待的上限（秒）。默认为 30。
+            statuses (Iterable[int], optional): 需要重试的 HTTP 状态码。默认为 429 和常见的 5xx。
+        """
+        self.attempts, self.base, self.cap = attempts, base, cap
+        self.statuses = frozenset(statuses)
+
+    def should_retry(self, method: str, status: Optional[int], attempt: int) -> bool:
+        """
+        判断是否应该重试。
+
+        非 GET 请求只在 429 时重试，因为此时请求一定没有被处理，重试不会重复提交。
+
+        Args:
+            method (str): HTTP 方法
+            status (Optional[int]): HTTP 状态码，None 表示超时或连接错误
+            attempt (int): 已重试的次数
+
+        Returns:
+            bool: 是否重试
+        """
+        if attempt >= self.attempts:
+            return False
+        if status == None:
+            return method == "GET"
+        return status in self.statuses and (method == "GET" or status == 429)
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        计算下一次重试前的等待时间。服务器给出 Retry-After 时优先使用。
+
+        Args:
+            attempt (int): 已重试的次数
+            retry_after (Optional[str], optional): Retry-After 响应头。默认为 None。
+
+        Returns:
+            float: 等待时间（秒）
+        """
+        if retry_after != None:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    return max(
+                        0.0,
+                        email.utils.parsedate_to_datetime(retry_after).timestamp()
+                        - time.time(),
+                    )
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(0, min(self.cap, self.base * 2**attempt))
+
+
+class Hedge:
+    """
+    对冲请求策略：GET 请求等待超过该接口近期延迟的某个分位数仍未返回时，再发出一个相同的请求，
+    使用先返回的结果并取消另一个。
+
+    对冲请求的数量不超过全部 GET 请求的 budget 比例；延迟样本不足的接口不对冲。
+    """
+
+    quantile: float  # 触发对冲的延迟分位数
+    min_delay: float  # 发出对冲请求前的最短等待时间（秒）
+    budget: float  # 对冲请求占全部 GET 请求的比例上限
+    min_samples: int  # 接口的延迟样本少于此数时不对冲
+    endpoints: Optional[frozenset[str]]  # 允许对冲的接口，None 为所有 GET 接口
+    requests: int  # 经过此策略的 GET 请求数
+    hedged: int  # 发出的对冲请求数
+    wins: int  # 对冲请求先返回的次数
+
+    def __init__(
+        self,
+        quantile: float = 0.95,
+        min_delay: float = 0.01,
+        budget: float = 0.05,
+        min_samples: int = 20,
+        endpoints: Optional[Iterable[str]] = None,
+    ):
+        """
+        初始化对冲策略。
+
+        Args:
+            quantile (float, optional): 触发对冲的延迟分位数，0 到 1 之间。默认为 0.95。
+            min_delay (float, optional): 发出对冲请求前的最短等待时间（秒）。默认为 0.01。
+            budget (float, optional): 对冲请求占全部 GET 请求的比例上限。默认为 0.05。
+            min_samples (int, optional): 接口的延迟样本少于此数时不对冲。默认为 20。
+            endpoints (Optional[Iterable[str]], optional): 允许对冲的接口，如 {"/api/comments"}。默认为所有 GET 接口。
+        """
+        if not 0 < quantile < 1:
+            raise ValueError("quantile must be between 0 and 1")
+        self.quantile, self.min_delay, self.budget = quantile, min_delay, budget
+        self.min_samples = min_samples
+        self.endpoints = None if endpoints == None else frozenset(endpoints)
+        self.requests = self.hedged = self.wins = 0
+
+    def delay(self, metrics: "Metrics", endpoint: str) -> Optional[float]:
+        """
+        计算发出对冲请求前的等待时间。
+
+        Args:
+            metrics (Metrics): 记录延迟的请求指标
+            endpoint (str): 接口名
+
+        Returns:
+            Optional[float]: 等待时间（秒），不应对冲时为 None
+        """
+        if self.endpoints != None and endpoint not in self.endpoints:
+            return None
+        if metrics.samples(endpoint) < self.min_samples:
+            return None
+        latency = metrics.percentile(endpoint, self.quantile)
+        return None if latency == None else max(self.min_delay, latency)
+
+    def allow(self) -> bool:
+        """
+        判断预算是否允许再发出一个对冲请求。
+
+        Returns:
+            bool: 是否允许
+        """
+        return self.hedged + 1 <= self.budget * self.requests
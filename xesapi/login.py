@@ -2,8 +2,8 @@ from typing import TypedDict, TypeVar, Optional
 from .type import TalToken_Data, Captcha_Data
 from .base import APIException
 from .user import User
-import aiohttp
-
+from .client import Client, _use_client
+from .deadline import Deadline, scope
 
 T = TypeVar("T")
 
@@ -26,8 +26,11 @@ class Captcha:
     __username: str
     __password: str
     __image: str
+    __client: Optional[Client]
 
-    def __init__(self, username: str, password: str, image: str):
+    def __init__(
+        self, username: str, password: str, image: str, client: Optional[Client] = None
+    ):
         """
         生成 Captcha 实例。
 
@@ -35,8 +38,10 @@ class Captcha:
             username (str): 用户名。
             password (str): 密码。
             image (str): Captcha base64 url。
+            client (Optional[Client], optional): 客户端。默认为 None。
         """
         self.__username, self.__password, self.__image = username, password, image
+        self.__client = client
 
     @property
     def image(self) -> str:
@@ -48,22 +53,25 @@ class Captcha:
         """
         return self.__image
 
-    async def resolve(self, captcha: str) -> User:
+    async def resolve(self, captcha: str, deadline: Optional[Deadline] = None) -> User:
         """
         完成Captcha。
 
         Args:
             captcha (str): captcha 对应的输入
+            deadline (Optional[Deadline], optional): 两步请求共用的截止时间。默认为 None。
 
         Raises:
             LoginException: 登录失败的情况
+            TimeoutError: 超时或超过截止时间
 
         Returns:
             User: 用户实例
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                "https://passport.100tal.com/v1/web/login/pwd",
+        async with _use_client(self.__client) as client, scope(deadline):
+            async with client.request(
+                "POST",
+                client.passport_url + "/v1/web/login/pwd",
                 data={
                     "symbol": self.__username,
                     "password": self.__password,
@@ -77,11 +85,14 @@ class Captcha:
                     "referer": "https://login.xueersi.com/",
                 },
             ) as req:
-                c: LoginResponse[TalToken_Data] = await req.json()
+                c: LoginResponse[TalToken_Data] = await req.json(
+                    loads=client.json_loads
+                )
                 if c["errcode"] != 0 or c["data"] == None:
                     raise APIException(c["errmsg"])
-                async with session.post(
-                    "https://login.xueersi.com/V1/Web/getToken",
+                async with client.request(
+                    "POST",
+                    client.login_url + "/V1/Web/getToken",
                     data={"code": c["data"]["code"]},
                     headers={
                         "Content-Type": "application/x-www-form-urlencoded",
@@ -91,26 +102,35 @@ class Captcha:
                         "referer": "https://login.xueersi.com/",
                     },
                 ) as req2:
-                    return User(req2.cookies)
+                    return User(req2.cookies, self.__client)
 
 
-async def login(username: str, password: str) -> Captcha:
+async def login(
+    username: str,
+    password: str,
+    client: Optional[Client] = None,
+    deadline: Optional[Deadline] = None,
+) -> Captcha:
     """
     进行登录操作。
 
     Args:
         username (str): 用户名（手机号，邮箱等）
         password (str): 密码
+        client (Optional[Client], optional): 客户端。登录后的 User 会沿用它。默认为 None。
+        deadline (Optional[Deadline], optional): 截止时间。默认为 None。
 
     Raises:
         APIException: API 错误
+        TimeoutError: 超时或超过截止时间
 
     Returns:
         Captcha: 验证码实例。
     """
-    async with aiohttp.ClientSession("https://passport.100tal.com/") as session:
-        async with session.post(
-            "/v1/web/captcha/get",
+    async with _use_client(client) as api, scope(deadline):
+        async with api.request(
+            "POST",
+            api.passport_url + "/v1/web/captcha/get",
             data={
                 "symbol": username,
                 "password": password,
@@ -124,7 +144,7 @@ async def login(username: str, password: str) -> Captcha:
                 "referer": "https://login.xueersi.com/",
             },
         ) as req:
-            c: LoginResponse[Captcha_Data] = await req.json()
+            c: LoginResponse[Captcha_Data] = await req.json(loads=api.json_loads)
             if c["errcode"] != 0:
                 raise APIException(c["errmsg"])
-            return Captcha(username, password, c["data"]["captcha"])
+            return Captcha(username, password, c["data"]["captcha"], client)
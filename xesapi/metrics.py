@@ -0,0 +1,260 @@
+from typing import Optional, Callable, Iterable, Any
+from collections import deque
+from types import SimpleNamespace
+import aiohttp
+import time
+import re
+
+
+def endpoint(path: str) -> str:
+    """
+    获得路径对应的接口名：去掉主机和查询参数，数字段替换为 {id}。
+
+    Args:
+        path (str): 路径或完整 URL
+
+    Returns:
+        str: 接口名，如 "/api/compilers/v2/{id}"
+    """
+    path = re.sub(r"^[a-z]+://[^/]+", "", path).split("?", 1)[0]
+    return re.sub(r"/\d+(?=/|$)", "/{id}", path)
+
+
+class RequestEvent:
+    """
+    一次请求的信息，传给 on_request_start 和 on_request_end 回调。
+    """
+
+    method: str  # HTTP 方法
+    url: str  # 完整 URL
+    endpoint: str  # 接口名
+    status: Optional[int]  # 状态码，请求开始时或失败时为 None
+    elapsed: float  # 从开始到收到响应头（或失败）的时间（秒）
+    bytes_sent: int  # 发送的请求体字节数
+    bytes_received: int  # 已接收的响应体字节数（on_request_end 时响应体通常还未读取）
+    error: Optional[BaseException]  # 失败时的异常
+
+    def __init__(self, method: str, url: str):
+        """
+        初始化 RequestEvent。
+
+        Args:
+            method (str): HTTP 方法
+            url (str): 完整 URL
+        """
+        self.method, self.url, self.endpoint = method, url, endpoint(url)
+        self.status, self.elapsed, self.error = None, 0.0, None
+        self.bytes_sent = self.bytes_received = 0
+
+
+class _EndpointStats:
+    requests: int
+    errors: int
+    bytes_sent: int
+    bytes_received: int
+    latency_sum: float
+    buckets: list[int]
+    statuses: dict[int, int]
+    recent: deque[float]
+
+    def __init__(self, buckets: int, samples: int):
+        self.requests = self.errors = self.bytes_sent = self.bytes_received = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * buckets
+        self.statuses = {}
+        self.recent = deque(maxlen=samples)
+
+
+class Metrics:
+    """
+    请求指标：按接口统计请求数、错误数、字节数和延迟直方图。
+
+    传给 Client 后通过 aiohttp 的 TraceConfig 收集，可导出为 dict 或 Prometheus 文本格式。
+    """
+
+    buckets: tuple[float, ...]  # 延迟直方图的桶上界（秒）
+    on_request_start: list[Callable[[RequestEvent], Any]]  # 请求开始时的回调
+    on_request_end: list[Callable[[RequestEvent], Any]]  # 收到响应头或失败时的回调
+    __stats: dict[str, _EndpointStats]
+    __samples: int
+
+    def __init__(
+        self,
+        buckets: Iterable[float] = (
+            0.01,
+            0.025,
+            0.05,
+            0.1,
+            0.25,
+            0.5,
+            1.0,
+            2.5,
+            5.0,
+            10.0,
+        ),
+        samples: int = 1024,
+    ):
+        """
+        初始化 Metrics。
+
+        Args:
+            buckets (Iterable[float], optional): 延迟直方图的桶上界（秒）。
+            samples (int, optional): 每个接口保留的最近延迟样本数，用于计算分位数。默认为 1024。
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.on_request_start, self.on_request_end = [], []
+        self.__stats = {}
+        self.__samples = samples
+
+    def __get(self, name: str) -> _EndpointStats:
+        if name not in self.__stats:
+            self.__stats[name] = _EndpointStats(len(self.buckets), self.__samples)
+        return self.__stats[name]
+
+    def __finish(self, event: RequestEvent):
+        stats = self.__get(event.endpoint)
+        stats.requests += 1
+        stats.bytes_sent += event.bytes_sent
+        stats.latency_sum += event.elapsed
+        stats.recent.append(event.elapsed)
+        for i, bound in enumerate(self.buckets):
+            if event.elapsed <= bound:
+                stats.buckets[i] += 1
+        if event.error != None:
+            stats.errors += 1
+        else:
+            stats.statuses[event.status] = stats.statuses.get(event.status, 0) + 1
+        for callback in self.on_request_end:
+            callback(event)
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """
+        生成收集指标用的 TraceConfig。Client 会自动使用，一般不需要直接调用。
+
+        Returns:
+            aiohttp.TraceConfig: TraceConfig
+        """
+
+        async def start(_: Any, ctx: SimpleNamespace, params: Any):
+            ctx.event = RequestEvent(params.method, str(params.url))
+            ctx.begin = time.monotonic()
+            for callback in self.on_request_start:
+                callback(ctx.event)
+
+        async def sent(_: Any, ctx: SimpleNamespace, params: Any):
+            ctx.event.bytes_sent += len(params.chunk)
+
+        async def received(_: Any, ctx: SimpleNamespace, params: Any):
+            ctx.event.bytes_received += len(params.chunk)
+            self.__get(ctx.event.endpoint).bytes_received += len(params.chunk)
+
+        async def end(_: Any, ctx: SimpleNamespace, params: Any):
+            ctx.event.elapsed = time.monotonic() - ctx.begin
+            ctx.event.status = params.response.status
+            self.__finish(ctx.event)
+
+        async def error(_: Any, ctx: SimpleNamespace, params: Any):
+            ctx.event.elapsed = time.monotonic() - ctx.begin
+            ctx.event.error = params.exception
+            self.__finish(ctx.event)
+
+        config = aiohttp.TraceConfig()
+        config.on_request_start.append(start)
+        config.on_request_chunk_sent.append(sent)
+        config.on_response_chunk_received.append(received)
+        config.on_request_end.append(end)
+        config.on_request_exception.append(error)
+        return config
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        """
+        根据最近的样本估计某个接口的延迟分位数。
+
+        Args:
+            name (str): 接口名
+            q (float): 分位数，0 到 1 之间
+
+        Returns:
+            Optional[float]: 延迟（秒），没有样本时为 None
+        """
+        stats = self.__stats.get(name)
+        if stats == None or not stats.recent:
+            return None
+        ordered = sorted(stats.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def samples(self, name: str) -> int:
+        """
+        获得某个接口用于估计分位数的近期样本数。
+
+        Args:
+            name (str): 接口名
+
+        Returns:
+            int: 样本数
+        """
+        stats = self.__stats.get(name)
+        return 0 if stats == None else len(stats.recent)
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """
+        导出为 dict。
+
+        Returns:
+            dict[str, dict[str, Any]]: {接口名: 指标}
+        """
+        return {
+            name: {
+                "requests": stats.requests,
+                "errors": stats.errors,
+                "statuses": dict(stats.statuses),
+                "bytes_sent": stats.bytes_sent,
+                "bytes_received": stats.bytes_received,
+                "latency": {
+                    "count": stats.requests,
+                    "sum": stats.latency_sum,
+                    "buckets": dict(zip(self.buckets, stats.buckets)),
+                    "p50": self.percentile(name, 0.5),
+                    "p99": self.percentile(name, 0.99),
+                },
+            }
+            for name, stats in self.__stats.items()
+        }
+
+    def prometheus(self, prefix: str = "xesapi") -> str:
+        """
+        导出为 Prometheus 文本格式。
+
+        Args:
+            prefix (str, optional): 指标名前缀。默认为 "xesapi"。
+
+        Returns:
+            str: Prometheus 文本
+        """
+        stats = sorted(self.__stats.items())
+        labels = {
+            name: 'endpoint="' + name.replace("\\", "\\\\").replace('"', '\\"') + '"'
+            for name, _ in stats
+        }
+        lines = [f"# TYPE {prefix}_requests_total counter"]
+        for name, i in stats:
+            for status, count in sorted(i.statuses.items()):
+                lines.append(
+                    f'{prefix}_requests_total{{{labels[name]},status="{status}"}} {count}'
+                )
+        for metric, attr in (
+            ("request_errors_total", "errors"),
+            ("request_bytes_total", "bytes_sent"),
+            ("response_bytes_total", "bytes_received"),
+        ):
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            for name, i in stats:
+                lines.append(f"{prefix}_{metric}{{{labels[name]}}} {getattr(i, attr)}")
+        metric = f"{prefix}_request_duration_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        for name, i in stats:
+            for bound, count in zip(self.buckets + ("+Inf",), i.buckets + [i.requests]):
+                lines.append(f'{metric}_bucket{{{labels[name]},le="{bound}"}} {count}')
+            lines.append(f"{metric}_sum{{{labels[name]}}} {i.latency_sum}")
+            lines.append(f"{metric}_count{{{labels[name]}}} {i.requests}")
+        return "\n".join(lines) + "\n"
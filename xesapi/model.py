@@ -0,0 +1,184 @@
+from typing import Any
+from .type import Work_Data, Comment_Data, Reply_Data
+import json
+import sys
+
+
+class _Compact:
+    """
+    紧凑数据对象的基类。
+
+    常用字段保存在 __slots__ 属性中，其余字段编码为 JSON 字节串，只在访问时解码。
+    需要调用 API 时，可用 data 重新构造 Work、Comment 或 Reply。
+    """
+
+    __slots__ = ("_raw",)
+    _fields: tuple[str, ...] = ()  # 保存为属性的字段
+    _interned: tuple[str, ...] = ()  # 重复率高、需要驻留的字符串字段
+    _raw: bytes
+
+    def __init__(self, data: Any):
+        """
+        从 API 数据构造紧凑对象。
+
+        Args:
+            data (Any): API 返回的数据
+        """
+        for key in self._fields:
+            value = data.get(key)
+            if key in self._interned and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, key, value)
+        self._raw = json.dumps(
+            {k: v for k, v in data.items() if k not in self._fields},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        获得任意字段。不常用的字段每次访问都会解码。
+
+        Args:
+            key (str): 字段名
+            default (Any, optional): 字段不存在时的返回值。默认为 None。
+
+        Returns:
+            Any: 字段值
+        """
+        if key in self._fields:
+            return getattr(self, key)
+        return json.loads(self._raw).get(key, default)
+
+    def _decode(self) -> Any:
+        data = json.loads(self._raw)
+        for key in self._fields:
+            data[key] = getattr(self, key)
+        return data
+
+    def __repr__(self) -> str:
+        fields = " ".join(f"{key}={getattr(self, key)!r}" for key in self._fields[:3])
+        return f"<{type(self).__name__} {fields}>"
+
+
+class CompactReply(_Compact):
+    """
+    紧凑的回复数据。
+    """
+
+    __slots__ = (
+        "id",
+        "parent_id",
+        "target_id",
+        "topic_id",
+        "user_id",
+        "reply_user_id",
+        "username",
+        "likes",
+        "created_at",
+        "content",
+    )
+    _fields = __slots__
+    _interned = ("topic_id", "user_id", "reply_user_id", "username")
+    id: int  # 回复ID
+    parent_id: int  # 父评论 id
+    target_id: int  # 回复目标的id
+    topic_id: str  # topic id
+    user_id: str  # 回复作者的id
+    reply_user_id: str  # 回复目标评论的作者的ID
+    username: str  # 回复作者的昵称
+    likes: int  # 喜欢数
+    created_at: str  # 创建时间
+    content: str  # 回复内容
+
+    @property
+    def data(self) -> Reply_Data:
+        """
+        解码完整的回复数据。
+
+        Returns:
+            Reply_Data: 回复数据
+        """
+        return self._decode()
+
+
+class CompactComment(_Compact):
+    """
+    紧凑的评论数据。自带的回复列表保存在未解码部分中。
+    """
+
+    __slots__ = (
+        "id",
+        "topic_id",
+        "user_id",
+        "username",
+        "likes",
+        "replies",
+        "create_at",
+        "content",
+    )
+    _fields = __slots__
+    _interned = ("topic_id", "user_id", "username")
+    id: int  # 评论id
+    topic_id: str  # 话题 ID
+    user_id: str  # 用户ID
+    username: str  # 用户名
+    likes: int  # 赞数
+    replies: int  # 回复数
+    create_at: str  # 创建时间
+    content: str  # 评论内容
+
+    @property
+    def data(self) -> Comment_Data:
+        """
+        解码完整的评论数据。
+
+        Returns:
+            Comment_Data: 评论数据
+        """
+        return self._decode()
+
+
+class CompactWork(_Compact):
+    """
+    紧凑的作品数据。
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "topic_id",
+        "user_id",
+        "lang",
+        "likes",
+        "views",
+        "comments",
+        "favorites",
+        "source_code_views",
+        "popular_score",
+        "published_at",
+    )
+    _fields = __slots__
+    _interned = ("lang",)
+    id: int  # id
+    name: str  # 作品
+    topic_id: str  # 作品对应的评论区ID
+    user_id: int  # 用户的 id
+    lang: str  # 语言
+    likes: int  # 赞数
+    views: int  # 观看数
+    comments: int  # 评论数
+    favorites: int  # 收藏数
+    source_code_views: int  # 改编数
+    popular_score: int
+    published_at: str  # 发布时间
+
+    @property
+    def data(self) -> Work_Data:
+        """
+        解码完整的作品数据。
+
+        Returns:
+            Work_Data: 作品数据
+        """
+        return self._decode()
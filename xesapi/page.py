@@ -0,0 +1,118 @@
+from typing import Optional, AsyncGenerator, Callable, Union, Literal, Any
+from collections import deque
+from .user import User, APIResponse
+from .type import GetComment_Data
+from .base import APIException
+from .client import Client
+from .deadline import Deadline
+import asyncio
+
+_AUTO_PER_PAGE = 100  # 自动模式下第一页请求的数量
+PerPage = Union[int, Literal["auto"]]
+
+
+async def _fetch_page(
+    client: Client, path: str, user: Optional[User], deadline: Optional[Deadline] = None
+) -> "GetComment_Data[Any]":
+    """
+    获得一页评论或回复。
+
+    Args:
+        client (Client): 客户端
+        path (str): 请求路径
+        user (Optional[User]): 用户上下文
+        deadline (Optional[Deadline], optional): 截止时间。默认为 None。
+
+    Raises:
+        APIException: API 错误
+
+    Returns:
+        GetComment_Data[Any]: 页面数据
+    """
+    c: APIResponse[GetComment_Data[Any]] = await client.fetch(
+        "GET", path, user, deadline=deadline, headers={"User-Agent": "_"}
+    )
+    # 失败的响应可能没有 stat（如 {"status_code": 404, "message": ...}）。
+    if not isinstance(c, dict) or c.get("stat") != 1 or c.get("data") == None:
+        error = c if isinstance(c, dict) else {}
+        raise APIException(error.get("msg") or error.get("message") or "未知错误")
+    return c["data"]
+
+
+async def _pages(
+    client: Client,
+    path: Callable[[int, int], str],
+    user: Optional[User],
+    per_page: PerPage,
+    prefetch: int = 1,
+    start: int = 1,
+    deadline: Optional[Deadline] = None,
+) -> AsyncGenerator[list[Any], Any]:
+    """
+    按顺序获得每一页的数据，同时最多保持 prefetch 页在请求中。
+
+    遇到不满 per_page 的页面或达到 total 指示的最后一页时停止。
+    per_page 为 "auto" 时，第一页请求较大的数量，之后使用服务器实际接受的数量。
+
+    Args:
+        client (Client): 客户端
+        path (Callable[[int, int], str]): (页码, 每页数量) 到请求路径的映射
+        user (Optional[User]): 用户上下文
+        per_page (PerPage): 每页数量，或 "auto"
+        prefetch (int, optional): 同时请求的页数。默认为 1，即逐页请求。
+        start (int, optional): 起始页码。默认为 1。
+        deadline (Optional[Deadline], optional): 所有页面共用的截止时间。默认为 None。
+
+    Raises:
+        APIException: API 错误
+        TimeoutError: 超过截止时间
+
+    Returns:
+        AsyncGenerator[list[Any], Any]: 页面生成器
+    """
+    if prefetch < 1:
+        raise ValueError("prefetch must be at least 1")
+    if per_page != "auto" and per_page < 1:
+        raise ValueError("per_page must be at least 1")
+    size = _AUTO_PER_PAGE if per_page == "auto" else per_page
+    window: deque[asyncio.Task[GetComment_Data[Any]]] = deque()
+    next_page, last_page, first = start, None, True
+    try:
+        while True:
+            # 第一页返回前不知道总数，先只请求第一页，避免多余的请求。
+            while len(window) < (1 if first else prefetch) and (
+                last_page == None or next_page <= last_page
+            ):
+                window.append(
+                    asyncio.ensure_future(
+                        _fetch_page(client, path(next_page, size), user, deadline)
+                    )
+                )
+                next_page += 1
+            if not window:
+                break
+            page = await window.popleft()
+            if first:
+                first = False
+                if per_page == "auto":
+                    # 服务器可能会限制每页数量，之后的页面按实际数量计算偏移。
+                    honoured = int(page.get("per_page") or len(page["data"]))
+                    size = min(size, honoured) if honoured > 0 else size
+                    count = len(page["data"])
+                    if 0 < count < size and (
+                        page.get("total") == None or int(page["total"]) > count
+                    ):
+                        # 有的服务器回显请求的数量，实际却按自己的上限返回。还有剩余数据（或总数未知）时，
+                        # 以实际条数为准；总数未知时最多多请求一个空页。
+                        size = count
+                if page.get("total") != None:
+                    # 有总数时，不请求超出范围的页面。
+                    last_page = max(1, -(-int(page["total"]) // size))
+            yield page["data"]
+            if len(page["data"]) != size:
+                break
+    finally:
+        for task in window:
+            task.cancel()
+        if window:
+            await asyncio.gather(*window, return_exceptions=True)
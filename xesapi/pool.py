@@ -0,0 +1,259 @@
+from typing import (
+    Optional,
+    Literal,
+    Iterable,
+    Callable,
+    Awaitable,
+    AsyncGenerator,
+    AsyncIterator,
+    TypeVar,
+    Union,
+    Any,
+)
+from contextlib import asynccontextmanager, aclosing
+from .user import User
+from .type import Info_Data
+from .work import Work, Comment, Reply, get_work
+from .limit import RateLimiter
+from .base import APIException
+from .page import PerPage
+import asyncio
+import aiohttp
+import time
+
+T = TypeVar("T")
+Strategy = Literal["round_robin", "least_loaded"]
+
+
+class _Member:
+    user: User
+    limiter: Optional[RateLimiter]
+    in_flight: int
+    requests: int
+    errors: int
+    consecutive: int
+    benched: int
+    benched_until: float
+
+    def __init__(self, user: User, rate: Optional[float]):
+        self.user = user
+        self.limiter = None if rate == None else RateLimiter(rate)
+        self.in_flight = self.requests = self.errors = 0
+        self.consecutive = self.benched = 0
+        self.benched_until = 0.0
+
+
+class UserPool:
+    """
+    多账号用户池：把需要登录的调用分摊到多个账号上，吞吐量随账号数增长。
+
+    连续失败 max_errors 次的账号会被暂时停用 bench 秒；所有账号都被停用时，调用会等待最早恢复的账号。
+    """
+
+    strategy: Strategy  # 选择账号的策略
+    max_errors: int  # 连续失败多少次后停用账号
+    bench: float  # 停用时间（秒）
+    __members: list[_Member]
+    __next: int
+    __rate: Optional[float]
+
+    def __init__(
+        self,
+        users: Iterable[User] = (),
+        strategy: Strategy = "round_robin",
+        max_errors: int = 3,
+        bench: float = 60.0,
+        rate: Optional[float] = None,
+    ):
+        """
+        初始化 UserPool。
+
+        Args:
+            users (Iterable[User], optional): 账号。默认为空。
+            strategy (Strategy, optional): "round_robin" 为轮流使用；"least_loaded" 为使用进行中调用最少的账号。默认为 "round_robin"。
+            max_errors (int, optional): 连续失败多少次后停用账号。默认为 3。
+            bench (float, optional): 停用时间（秒）。默认为 60。
+            rate (Optional[float], optional): 每个账号每秒最多的调用数。默认不限制。
+        """
+        if max_errors < 1:
+            raise ValueError("max_errors must be at least 1")
+        self.strategy, self.max_errors, self.bench = strategy, max_errors, bench
+        self.__rate = rate
+        self.__members = [_Member(i, rate) for i in users]
+        self.__next = 0
+
+    def add(self, user: User):
+        """
+        添加账号。
+
+        Args:
+            user (User): 账号
+        """
+        self.__members.append(_Member(user, self.__rate))
+
+    def remove(self, user: User):
+        """
+        移除账号，进行中的调用不受影响。
+
+        Args:
+            user (User): 账号
+        """
+        self.__members = [i for i in self.__members if i.user is not user]
+
+    @property
+    def users(self) -> list[User]:
+        """
+        获得所有账号。
+
+        Returns:
+            list[User]: 账号列表
+        """
+        return [i.user for i in self.__members]
+
+    def __len__(self) -> int:
+        return len(self.__members)
+
+    def __pick(self, now: float) -> Optional[_Member]:
+        healthy = [i for i in self.__members if i.benched_until <= now]
+        if not healthy:
+            return None
+        if self.strategy == "least_loaded":
+            return min(healthy, key=lambda i: (i.in_flight, i.requests))
+        for _ in range(len(self.__members)):
+            member = self.__members[self.__next % len(self.__members)]
+            self.__next += 1
+            if member.benched_until <= now:
+                return member
+        return healthy[0]
+
+    @asynccontextmanager
+    async def use(self) -> AsyncIterator[User]:
+        """
+        借用一个账号。块内抛出的 API 和网络错误计入该账号的失败次数。
+
+        Raises:
+            ValueError: 池中没有账号
+
+        Returns:
+            AsyncIterator[User]: 账号，使用 async with 获得
+        """
+        while True:
+            if not self.__members:
+                raise ValueError("user pool is empty")
+            now = time.monotonic()
+            member = self.__pick(now)
+            if member != None:
+                break
+            await asyncio.sleep(min(i.benched_until for i in self.__members) - now)
+        member.in_flight += 1
+        try:
+            if member.limiter != None:
+                await member.limiter.acquire()
+            member.requests += 1
+            yield member.user
+        except (APIException, aiohttp.ClientError, asyncio.TimeoutError):
+            member.errors += 1
+            member.consecutive += 1
+            if member.consecutive >= self.max_errors:
+                member.consecutive = 0
+                member.benched += 1
+                member.benched_until = time.monotonic() + self.bench
+            raise
+        else:
+            member.consecutive = 0
+        finally:
+            member.in_flight -= 1
+
+    async def run(self, call: Callable[[User], Awaitable[T]]) -> T:
+        """
+        用一个账号执行调用。
+
+        Args:
+            call (Callable[[User], Awaitable[T]]): 以账号为参数的调用
+
+        Returns:
+            T: 调用的结果
+        """
+        async with self.use() as user:
+            return await call(user)
+
+    async def get_work(self, id: int) -> Work:
+        """
+        用池中的一个账号获得作品。返回的作品之后的调用也使用该账号。
+
+        Args:
+            id (int): 作品id
+
+        Raises:
+            APIException: API 错误
+
+        Returns:
+            Work: 作品实例
+        """
+        return await self.run(lambda user: get_work(id, user))
+
+    async def info(self) -> Optional[Info_Data]:
+        """
+        用池中的一个账号获得其个人信息，可用于检查账号状态。
+
+        Raises:
+            APIException: API 错误
+
+        Returns:
+            Optional[Info_Data]: 个人信息
+        """
+        return await self.run(lambda user: user.info())
+
+    async def send(self, target: Union[Work, Comment, Reply], content: str):
+        """
+        用池中的一个账号发布评论或回复。
+
+        Args:
+            target (Union[Work, Comment, Reply]): 作品、评论或回复
+            content (str): 内容
+
+        Raises:
+            APIException: API 错误
+        """
+        await self.run(lambda user: target.__class__(target.data, user).send(content))
+
+    async def comment(
+        self, work: Work, prefetch: int = 1, per_page: PerPage = 15, start: int = 1
+    ) -> AsyncGenerator[Comment, Any]:
+        """
+        用池中的一个账号遍历作品的评论。整个遍历使用同一个账号。
+
+        Args:
+            work (Work): 作品
+            prefetch (int, optional): 同时请求的页数。默认为 1。
+            per_page (PerPage, optional): 每页数量。默认为 15。
+            start (int, optional): 起始页码。默认为 1。
+
+        Returns:
+            AsyncGenerator[Comment, Any]: 评论生成器，使用async for遍历
+        """
+        async with self.use() as user:
+            comments = Work(work.data, user).comment(prefetch, per_page, start)
+            async with aclosing(comments) as iterator:
+                async for comment in iterator:
+                    yield comment
+
+    def stats(self) -> list[dict[str, Any]]:
+        """
+        获得每个账号的统计信息。
+
+        Returns:
+            list[dict[str, Any]]: 按添加顺序的调用数、失败数、停用次数和当前状态
+        """
+        now = time.monotonic()
+        return [
+            {
+                "user": i.user,
+                "requests": i.requests,
+                "errors": i.errors,
+                "in_flight": i.in_flight,
+                "benched": i.benched,
+                "healthy": i.benched_until <= now,
+            }
+            for i in self.__members
+        ]
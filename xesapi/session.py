@@ -0,0 +1,155 @@
+from typing import Optional, Callable, Awaitable
+from abc import ABC, abstractmethod
+from .user import User
+from .client import Client
+import json
+import os
+
+
+class SessionStore(ABC):
+    """
+    登录状态存储的基类。子类实现 load、save 和 delete 即可保存到其它位置（如 Redis）。
+    """
+
+    @abstractmethod
+    def load(self, key: str) -> Optional[str]:
+        """
+        读取登录状态。
+
+        Args:
+            key (str): 键，一般为用户名
+
+        Returns:
+            Optional[str]: User.dumps 的结果，不存在时为 None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, key: str, value: str):
+        """
+        保存登录状态。
+
+        Args:
+            key (str): 键，一般为用户名
+            value (str): User.dumps 的结果
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, key: str):
+        """
+        删除登录状态。
+
+        Args:
+            key (str): 键，一般为用户名
+        """
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """
+    保存在内存中的登录状态，进程退出后丢失。
+    """
+
+    __data: dict[str, str]
+
+    def __init__(self):
+        """
+        初始化 MemorySessionStore。
+        """
+        self.__data = {}
+
+    def load(self, key: str) -> Optional[str]:
+        return self.__data.get(key)
+
+    def save(self, key: str, value: str):
+        self.__data[key] = value
+
+    def delete(self, key: str):
+        self.__data.pop(key, None)
+
+
+class FileSessionStore(SessionStore):
+    """
+    保存在 JSON 文件中的登录状态。文件权限为仅所有者可读写，写入时先写临时文件再替换。
+    """
+
+    path: str  # 文件路径
+
+    def __init__(self, path: str):
+        """
+        初始化 FileSessionStore。
+
+        Args:
+            path (str): 文件路径，不存在时自动创建
+        """
+        self.path = path
+
+    def __read(self) -> dict[str, str]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            # 文件损坏时视为没有保存的登录状态，重新登录后会覆盖。
+            return {}
+
+    def __write(self, data: dict[str, str]):
+        temp = self.path + ".tmp"
+        fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp, self.path)
+
+    def load(self, key: str) -> Optional[str]:
+        return self.__read().get(key)
+
+    def save(self, key: str, value: str):
+        data = self.__read()
+        data[key] = value
+        self.__write(data)
+
+    def delete(self, key: str):
+        data = self.__read()
+        if data.pop(key, None) != None:
+            self.__write(data)
+
+
+async def restore_user(
+    store: SessionStore,
+    key: str,
+    relogin: Callable[[], Awaitable[User]],
+    client: Optional[Client] = None,
+    validate: bool = True,
+) -> User:
+    """
+    恢复保存的登录状态，只有在没有保存、已过期或已失效时才重新登录。
+
+    重新登录得到的用户会保存到 store 中。
+
+    Args:
+        store (SessionStore): 登录状态存储
+        key (str): 键，一般为用户名
+        relogin (Callable[[], Awaitable[User]]): 重新登录的函数，一般调用 login 并完成验证码
+        client (Optional[Client], optional): 恢复的用户使用的客户端。默认为 None。
+        validate (bool, optional): 是否请求一次个人信息确认登录状态有效。为 False 时只检查过期时间。默认为 True。
+
+    Raises:
+        APIException: 重新登录失败
+
+    Returns:
+        User: 用户实例
+    """
+    text = store.load(key)
+    if text != None:
+        try:
+            user = User.loads(text, client)
+        except ValueError:
+            user = None
+        if user != None and not user.expired:
+            if not validate or await user.validate():
+                return user
+    user = await relogin()
+    store.save(key, user.dumps())
+    return user
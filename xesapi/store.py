@@ -0,0 +1,299 @@
+from typing import Optional, Iterable, Iterator, Any
+from .type import Work_Data, Comment_Data, Reply_Data
+import sqlite3
+import json
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS works (
+    id INTEGER PRIMARY KEY, topic_id TEXT, user_id TEXT, likes INTEGER,
+    views INTEGER, created_at TEXT, data TEXT, fetched_at REAL
+);
+CREATE TABLE IF NOT EXISTS comments (
+    id INTEGER PRIMARY KEY, topic_id TEXT, user_id TEXT, likes INTEGER,
+    created_at TEXT, data TEXT, fetched_at REAL
+);
+CREATE TABLE IF NOT EXISTS replies (
+    id INTEGER PRIMARY KEY, parent_id INTEGER, topic_id TEXT, user_id TEXT,
+    likes INTEGER, created_at TEXT, data TEXT, fetched_at REAL
+);
+CREATE TABLE IF NOT EXISTS synced (scope TEXT PRIMARY KEY, synced_at REAL);
+CREATE INDEX IF NOT EXISTS works_topic ON works (topic_id);
+CREATE INDEX IF NOT EXISTS works_user ON works (user_id);
+CREATE INDEX IF NOT EXISTS works_created ON works (created_at);
+CREATE INDEX IF NOT EXISTS works_likes ON works (likes);
+CREATE INDEX IF NOT EXISTS comments_topic ON comments (topic_id, id);
+CREATE INDEX IF NOT EXISTS comments_user ON comments (user_id);
+CREATE INDEX IF NOT EXISTS comments_created ON comments (created_at);
+CREATE INDEX IF NOT EXISTS comments_likes ON comments (likes);
+CREATE INDEX IF NOT EXISTS replies_parent ON replies (parent_id, id);
+CREATE INDEX IF NOT EXISTS replies_topic ON replies (topic_id);
+CREATE INDEX IF NOT EXISTS replies_user ON replies (user_id);
+CREATE INDEX IF NOT EXISTS replies_created ON replies (created_at);
+CREATE INDEX IF NOT EXISTS replies_likes ON replies (likes);
+"""
+
+
+class Store:
+    """
+    基于 SQLite 的本地数据存储，保存作品、评论和回复。
+
+    传给 Client 后，get_work、Work.comment 和 Comment.reply 会把获得的数据写入存储，
+    并在数据足够新时直接从存储返回。
+    """
+
+    max_age: float  # 数据的有效期（秒），超过后重新请求
+    __db: sqlite3.Connection
+
+    def __init__(self, path: str, max_age: float = 300.0):
+        """
+        初始化 Store。
+
+        Args:
+            path (str): 数据库文件路径，":memory:" 为内存数据库
+            max_age (float, optional): 数据的有效期（秒）。默认为 300。
+        """
+        self.max_age = max_age
+        # 可能在其它线程中创建（如 SyncClient），访问都在同一个事件循环中，不会并发。
+        self.__db = sqlite3.connect(path, check_same_thread=False)
+        self.__db.executescript(_SCHEMA)
+        self.__db.commit()
+
+    def upsert_works(self, works: Iterable[Work_Data]):
+        """
+        批量写入作品，在一个事务中完成。
+
+        Args:
+            works (Iterable[Work_Data]): 作品数据
+        """
+        now = time.time()
+        with self.__db:
+            self.__db.executemany(
+                "INSERT OR REPLACE INTO works VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        i["id"],
+                        i.get("topic_id"),
+                        str(i.get("user_id")),
+                        i.get("likes"),
+                        i.get("views"),
+                        i.get("created_at"),
+                        json.dumps(i, ensure_ascii=False),
+                        now,
+                    )
+                    for i in works
+                ),
+            )
+
+    def upsert_comments(self, comments: Iterable[Comment_Data]):
+        """
+        批量写入评论，在一个事务中完成。评论自带的回复也会一并写入。
+
+        Args:
+            comments (Iterable[Comment_Data]): 评论数据
+        """
+        now = time.time()
+        comments = list(comments)
+        with self.__db:
+            self.__db.executemany(
+                "INSERT OR REPLACE INTO comments VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        i["id"],
+                        i.get("topic_id"),
+                        i.get("user_id"),
+                        i.get("likes"),
+                        i.get("create_at"),
+                        json.dumps(i, ensure_ascii=False),
+                        now,
+                    )
+                    for i in comments
+                ),
+            )
+        replies = [
+            j for i in comments if "reply_list" in i for j in i["reply_list"]["data"]
+        ]
+        self.upsert_replies(replies)
+
+    def upsert_replies(self, replies: Iterable[Reply_Data]):
+        """
+        批量写入回复，在一个事务中完成。
+
+        Args:
+            replies (Iterable[Reply_Data]): 回复数据
+        """
+        now = time.time()
+        with self.__db:
+            self.__db.executemany(
+                "INSERT OR REPLACE INTO replies VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        i["id"],
+                        i.get("parent_id"),
+                        i.get("topic_id"),
+                        i.get("user_id"),
+                        i.get("likes"),
+                        i.get("created_at"),
+                        json.dumps(i, ensure_ascii=False),
+                        now,
+                    )
+                    for i in replies
+                ),
+            )
+
+    def mark_synced(self, scope: str, since: Optional[float] = None):
+        """
+        记录某个评论区（或某条评论的回复）已完整同步。
+
+        给出 since 时，同一事务中删除该范围内 since 之后没有再写入的行，
+        即服务器上已删除的评论或回复（以及已删除评论的回复）。
+
+        Args:
+            scope (str): 评论区为 topic_id，回复为 "topic_id/评论id"
+            since (Optional[float], optional): 本次完整遍历开始的时间（time.time）。默认为 None，不删除。
+        """
+        with self.__db:
+            if since != None and "/" in scope:
+                self.__db.execute(
+                    "DELETE FROM replies WHERE parent_id = ? AND fetched_at < ?",
+                    (int(scope.rsplit("/", 1)[1]), since),
+                )
+            elif since != None:
+                self.__db.execute(
+                    "DELETE FROM comments WHERE topic_id = ? AND fetched_at < ?",
+                    (scope, since),
+                )
+                self.__db.execute(
+                    "DELETE FROM replies WHERE topic_id = ? AND parent_id NOT IN "
+                    "(SELECT id FROM comments WHERE topic_id = ?)",
+                    (scope, scope),
+                )
+            self.__db.execute(
+                "INSERT OR REPLACE INTO synced VALUES (?, ?)", (scope, time.time())
+            )
+
+    def synced(self, scope: str) -> bool:
+        """
+        某个评论区（或某条评论的回复）是否在有效期内完整同步过。
+
+        Args:
+            scope (str): 评论区为 topic_id，回复为 "topic_id/评论id"
+
+        Returns:
+            bool: 是否可以直接从存储返回
+        """
+        row = self.__db.execute(
+            "SELECT synced_at FROM synced WHERE scope = ?", (scope,)
+        ).fetchone()
+        return row != None and time.time() - row[0] < self.max_age
+
+    def work(self, id: int) -> Optional[Work_Data]:
+        """
+        获得有效期内的作品。
+
+        Args:
+            id (int): 作品id
+
+        Returns:
+            Optional[Work_Data]: 作品数据，不存在或已过期时为 None
+        """
+        row = self.__db.execute(
+            "SELECT data, fetched_at FROM works WHERE id = ?", (id,)
+        ).fetchone()
+        if row == None or time.time() - row[1] >= self.max_age:
+            return None
+        return json.loads(row[0])
+
+    def comments(self, topic_id: str) -> Iterator[Comment_Data]:
+        """
+        按时间倒序获得评论区中的评论。
+
+        Args:
+            topic_id (str): 评论区 ID
+
+        Returns:
+            Iterator[Comment_Data]: 评论数据
+        """
+        for (data,) in self.__db.execute(
+            "SELECT data FROM comments WHERE topic_id = ? ORDER BY id DESC",
+            (topic_id,),
+        ):
+            yield json.loads(data)
+
+    def replies(self, parent_id: int) -> Iterator[Reply_Data]:
+        """
+        按时间顺序获得评论下的回复。
+
+        Args:
+            parent_id (int): 评论id
+
+        Returns:
+            Iterator[Reply_Data]: 回复数据
+        """
+        for (data,) in self.__db.execute(
+            "SELECT data FROM replies WHERE parent_id = ? ORDER BY id", (parent_id,)
+        ):
+            yield json.loads(data)
+
+    def top_comments(
+        self, limit: int = 10, topic_id: Optional[str] = None
+    ) -> list[Comment_Data]:
+        """
+        获得赞数最多的评论。
+
+        Args:
+            limit (int, optional): 数量。默认为 10。
+            topic_id (Optional[str], optional): 只统计此评论区。默认为全部。
+
+        Returns:
+            list[Comment_Data]: 评论数据
+        """
+        if topic_id == None:
+            rows = self.__db.execute(
+                "SELECT data FROM comments ORDER BY likes DESC LIMIT ?", (limit,)
+            )
+        else:
+            rows = self.__db.execute(
+                "SELECT data FROM comments WHERE topic_id = ? "
+                "ORDER BY likes DESC LIMIT ?",
+                (topic_id, limit),
+            )
+        return [json.loads(data) for (data,) in rows]
+
+    def commented_topics(self, user_id: str) -> list[str]:
+        """
+        获得用户评论或回复过的评论区。
+
+        Args:
+            user_id (str): 用户ID
+
+        Returns:
+            list[str]: topic_id 列表
+        """
+        return [
+            topic_id
+            for (topic_id,) in self.__db.execute(
+                "SELECT topic_id FROM comments WHERE user_id = ? "
+                "UNION SELECT topic_id FROM replies WHERE user_id = ?",
+                (user_id, user_id),
+            )
+        ]
+
+    def execute(self, sql: str, parameters: Iterable[Any] = ()) -> list[Any]:
+        """
+        执行任意只读查询。
+
+        Args:
+            sql (str): SQL 语句
+            parameters (Iterable[Any], optional): 参数。默认为空。
+
+        Returns:
+            list[Any]: 查询结果
+        """
+        return self.__db.execute(sql, tuple(parameters)).fetchall()
+
+    def close(self):
+        """
+        关闭数据库。
+        """
+        self.__db.close()
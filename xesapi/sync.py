@@ -0,0 +1,274 @@
+from typing import (
+    Optional,
+    Union,
+    Iterable,
+    Iterator,
+    AsyncGenerator,
+    Coroutine,
+    TypeVar,
+    Any,
+)
+from .client import Client
+from .user import User
+from .type import Info_Data
+from .login import Captcha, login
+from .work import Work, Comment, Reply, get_work, get_works
+from .page import PerPage
+import concurrent.futures
+import threading
+import asyncio
+
+T = TypeVar("T")
+
+
+class SyncClient:
+    """
+    同步客户端：在一个后台线程中运行事件循环和 Client，所有调用共用同一个连接池。
+
+    可以同时在多个线程中调用。返回的 Work、Comment、User 等对象绑定到内部的 Client，
+    它们的异步方法应通过 run 或本类的对应方法调用。
+    """
+
+    client: Client  # 内部的异步客户端
+    timeout: Optional[float]  # 每次调用的默认超时（秒）
+    __loop: asyncio.AbstractEventLoop
+    __thread: threading.Thread
+    __closed: bool
+
+    def __init__(self, timeout: Optional[float] = None, **options: Any):
+        """
+        初始化 SyncClient，启动后台线程。
+
+        Args:
+            timeout (Optional[float], optional): 每次调用的默认超时（秒）。默认不限制。
+            **options (Any): 传给 Client 的参数
+        """
+        self.timeout = timeout
+        self.client = Client(**options)
+        self.__closed = False
+        self.__loop = asyncio.new_event_loop()
+        self.__thread = threading.Thread(
+            target=self.__loop.run_forever, name="xesapi-sync", daemon=True
+        )
+        self.__thread.start()
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """
+        在后台事件循环中运行协程，等待并返回结果。
+
+        Args:
+            coro (Coroutine[Any, Any, T]): 协程
+            timeout (Optional[float], optional): 超时（秒）。默认使用 self.timeout。
+
+        Raises:
+            RuntimeError: 已关闭，或在后台线程中调用
+            concurrent.futures.TimeoutError: 超时，此时协程会被取消
+
+        Returns:
+            T: 协程的结果
+        """
+        if self.__closed:
+            coro.close()
+            raise RuntimeError("SyncClient is closed")
+        if threading.current_thread() is self.__thread:
+            coro.close()
+            raise RuntimeError("SyncClient.run cannot be called from its own loop")
+        future = asyncio.run_coroutine_threadsafe(coro, self.__loop)
+        try:
+            return future.result(self.timeout if timeout == None else timeout)
+        except concurrent.futures.TimeoutError:
+            # Python 3.10 中它不是内置的 TimeoutError。
+            future.cancel()
+            raise
+
+    def iterate(self, agen: AsyncGenerator[T, Any]) -> Iterator[T]:
+        """
+        把异步生成器转换为普通迭代器。提前结束迭代时会关闭异步生成器。
+
+        Args:
+            agen (AsyncGenerator[T, Any]): 异步生成器
+
+        Returns:
+            Iterator[T]: 迭代器
+        """
+        try:
+            while True:
+                try:
+                    yield self.run(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            if not self.__closed:
+                self.run(agen.aclose())
+
+    def login(self, username: str, password: str) -> Captcha:
+        """
+        进行登录操作。
+
+        Args:
+            username (str): 用户名（手机号，邮箱等）
+            password (str): 密码
+
+        Raises:
+            APIException: API 错误
+
+        Returns:
+            Captcha: 验证码实例，用 resolve 完成
+        """
+        return self.run(login(username, password, self.client))
+
+    def resolve(self, captcha: Captcha, code: str) -> User:
+        """
+        完成验证码。
+
+        Args:
+            captcha (Captcha): login 返回的验证码实例
+            code (str): 验证码对应的输入
+
+        Raises:
+            APIException: 登录失败
+
+        Returns:
+            User: 用户实例
+        """
+        return self.run(captcha.resolve(code))
+
+    def info(self, user: User) -> Optional[Info_Data]:
+        """
+        获得个人信息。
+
+        Args:
+            user (User): 用户
+
+        Raises:
+            APIException: API 错误
+
+        Returns:
+            Optional[Info_Data]: 个人信息
+        """
+        return self.run(user.info())
+
+    def get_work(self, id: int, user: Optional[User] = None) -> Work:
+        """
+        获得作品。
+
+        Args:
+            id (int): 作品id
+            user (Optional[User], optional): 用户上下文。默认为 None。
+
+        Raises:
+            APIException: API 错误
+
+        Returns:
+            Work: 作品实例
+        """
+        return self.run(get_work(id, user, self.client))
+
+    def get_works(
+        self,
+        ids: Iterable[int],
+        user: Optional[User] = None,
+        concurrency: int = 10,
+        ordered: bool = True,
+    ) -> Iterator[tuple[int, Union[Work, Exception]]]:
+        """
+        批量获得作品。
+
+        Args:
+            ids (Iterable[int]): 作品id
+            user (Optional[User], optional): 用户上下文。默认为 None。
+            concurrency (int, optional): 最大并发数。默认为 10。
+            ordered (bool, optional): 是否按 ids 的顺序返回。默认为 True。
+
+        Returns:
+            Iterator[tuple[int, Union[Work, Exception]]]: (作品id, 作品或异常) 迭代器
+        """
+        return self.iterate(get_works(ids, user, self.client, concurrency, ordered))
+
+    def comment(
+        self, work: Work, prefetch: int = 1, per_page: PerPage = 15, start: int = 1
+    ) -> Iterator[Comment]:
+        """
+        获得作品的评论。
+
+        Args:
+            work (Work): 作品
+            prefetch (int, optional): 同时请求的页数。默认为 1。
+            per_page (PerPage, optional): 每页数量。默认为 15。
+            start (int, optional): 起始页码。默认为 1。
+
+        Returns:
+            Iterator[Comment]: 评论迭代器
+        """
+        return self.iterate(work.comment(prefetch, per_page, start))
+
+    def reply(
+        self, comment: Comment, prefetch: int = 1, per_page: PerPage = 10
+    ) -> Iterator[Reply]:
+        """
+        获得评论的回复。
+
+        Args:
+            comment (Comment): 评论
+            prefetch (int, optional): 同时请求的页数。默认为 1。
+            per_page (PerPage, optional): 每页数量。默认为 10。
+
+        Returns:
+            Iterator[Reply]: 回复迭代器
+        """
+        return self.iterate(comment.reply(prefetch, per_page))
+
+    def send(self, target: Union[Work, Comment, Reply], content: str):
+        """
+        发布评论或回复。
+
+        Args:
+            target (Union[Work, Comment, Reply]): 作品、评论或回复
+            content (str): 内容
+
+        Raises:
+            APIException: API 错误
+        """
+        self.run(target.send(content))
+
+    def like(self, work: Work):
+        """
+        点赞作品。
+
+        Args:
+            work (Work): 作品
+
+        Raises:
+            APIException: API 错误
+        """
+        self.run(work.like())
+
+    def unlike(self, work: Work):
+        """
+        踩作品。
+
+        Args:
+            work (Work): 作品
+
+        Raises:
+            APIException: API 错误
+        """
+        self.run(work.unlike())
+
+    def close(self):
+        """
+        关闭连接池并停止后台线程。
+        """
+        if self.__closed:
+            return
+        self.run(self.client.close())
+        self.__closed = True
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        self.__thread.join()
+        self.__loop.close()
+
+    def __enter__(self) -> "SyncClient":
+        return self
+
+    def __exit__(self, *_: Any):
+        self.close()
@@ -1,8 +1,12 @@
 from typing import TypedDict, TypeVar, Optional, Union, TypeAlias
-from http.cookies import SimpleCookie
+from http.cookies import SimpleCookie, Morsel
+from email.utils import parsedate_to_datetime, formatdate
 from .base import APIException
 from .type import Info_Data
-import aiohttp
+from .client import Client, _use_client
+from .deadline import Deadline
+import json
+import time
 
 T = TypeVar("T")
 
@@ -24,15 +28,31 @@ APIResponse: TypeAlias = Union[_APIResponse, _FailedAPIResponse]
 
 class User:
     __cookie: SimpleCookie
+    __client: Optional[Client]
+    __expires: Optional[float]
 
-    def __init__(self, cookie: SimpleCookie):
+    def __init__(self, cookie: SimpleCookie, client: Optional[Client] = None):
         """
         初始化 User 类。
 
         Args:
             cookie (SimpleCookie): cookie
+            client (Optional[Client], optional): 客户端。默认为 None，即每次调用使用临时连接。
         """
-        self.__cookie = cookie
+        self.__cookie, self.__client = cookie, client
+        expires = [_expires(i) for i in cookie.values()]
+        known = [i for i in expires if i != None]
+        self.__expires = min(known) if known else None
+
+    @property
+    def client(self) -> Optional[Client]:
+        """
+        获得此用户绑定的客户端。
+
+        Returns:
+            Optional[Client]: 客户端
+        """
+        return self.__client
 
     @property
     def tal_token(self) -> Optional[str]:
@@ -54,21 +74,117 @@ class User:
         """
         return self.__cookie["xes_rfh"].value
 
-    async def info(self) -> Optional[Info_Data]:
+    @property
+    def expires(self) -> Optional[float]:
+        """
+        获得 cookie 最早的过期时间。
+
+        Returns:
+            Optional[float]: Unix 时间戳，服务器未设置过期时间时为 None
+        """
+        return self.__expires
+
+    @property
+    def expired(self) -> bool:
+        """
+        cookie 是否已经过期。只检查过期时间，不发送请求；会话被服务器注销时仍为 False。
+
+        Returns:
+            bool: 是否已经过期
+        """
+        return self.__expires != None and time.time() >= self.__expires
+
+    def dumps(self) -> str:
+        """
+        序列化 cookie，可用 User.loads 恢复，从而跳过登录和验证码。
+
+        Returns:
+            str: JSON 字符串
+        """
+        return json.dumps(
+            {
+                "cookies": {k: v.value for k, v in self.__cookie.items()},
+                "expires": self.__expires,
+            }
+        )
+
+    @classmethod
+    def loads(cls, text: str, client: Optional[Client] = None) -> "User":
+        """
+        从 dumps 的结果恢复用户。
+
+        Args:
+            text (str): User.dumps 返回的 JSON 字符串
+            client (Optional[Client], optional): 客户端。默认为 None。
+
+        Raises:
+            ValueError: 格式错误
+
+        Returns:
+            User: 用户实例
+        """
+        try:
+            data = json.loads(text)
+            cookie = SimpleCookie()
+            for key, value in data["cookies"].items():
+                cookie[key] = value
+                if data["expires"] != None:
+                    cookie[key]["expires"] = formatdate(data["expires"], usegmt=True)
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"invalid user data: {e!r}") from e
+        return cls(cookie, client)
+
+    async def validate(self, deadline: Optional[Deadline] = None) -> bool:
+        """
+        检查 cookie 是否仍然有效。已过期时不发送请求，否则请求一次个人信息（不使用缓存）。
+
+        Args:
+            deadline (Optional[Deadline], optional): 截止时间。默认为 None。
+
+        Returns:
+            bool: 是否有效
+        """
+        if self.expired or "xes_rfh" not in self.__cookie:
+            return False
+        async with _use_client(self.__client) as client:
+            c: APIResponse[Info_Data] = await client.fetch(
+                "GET", "/api/user/info", self, deadline=deadline
+            )
+            return c.get("stat") == 1 and c.get("data") != None
+
+    async def info(self, deadline: Optional[Deadline] = None) -> Optional[Info_Data]:
         """
         获得个人信息。
 
+        Args:
+            deadline (Optional[Deadline], optional): 截止时间。默认为 None。
+
         Raises:
             APIException: API 错误。
+            TimeoutError: 超时或超过截止时间。
 
         Returns:
             Optional[Info_Data]: 个人信息。当未登录时，返回 None。
         """
-        async with aiohttp.ClientSession(
-            "https://code.xueersi.com/", cookies={"xes_rfh": self.xes_rfh}
-        ) as session:
-            async with session.get("/api/user/info") as req:
-                c: APIResponse[Info_Data] = await req.json()
-                if c["stat"] != 1 or c["data"] == None:
-                    raise APIException(c["message"] if c["msg"] == None else c["msg"])
-                return c["data"]
+        async with _use_client(self.__client) as client:
+            c: APIResponse[Info_Data] = await client.fetch(
+                "GET", "/api/user/info", self, cache=True, deadline=deadline
+            )
+            if c["stat"] != 1 or c["data"] == None:
+                raise APIException(c["message"] if c["msg"] == None else c["msg"])
+            return c["data"]
+
+
+def _expires(morsel: "Morsel[str]") -> Optional[float]:
+    # max-age 相对于收到 cookie 的时间，这里近似为构造 User 的时间。
+    if morsel["max-age"]:
+        try:
+            return time.time() + int(morsel["max-age"])
+        except ValueError:
+            pass
+    if morsel["expires"]:
+        try:
+            return parsedate_to_datetime(morsel["expires"]).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return None
@@ -0,0 +1,253 @@
+from typing import Optional, Iterable, AsyncGenerator, Any
+from .user import User
+from .client import Client, _use_client
+from .work import Work, _fetch_work
+from .base import APIException
+import heapq
+import asyncio
+import aiohttp
+import time
+
+WATCHED_FIELDS = (
+    "likes",
+    "views",
+    "comments",
+    "favorites",
+    "source_code_views",
+    "popular_score",
+)
+
+
+class WorkDelta:
+    """
+    作品统计数据的一次变化。
+    """
+
+    id: int  # 作品id
+    work: Work  # 最新的作品
+    changes: dict[str, tuple[Any, Any]]  # {字段: (旧值, 新值)}
+    interval: float  # 下一次轮询的间隔（秒）
+
+    def __init__(
+        self, id: int, work: Work, changes: dict[str, tuple[Any, Any]], interval: float
+    ):
+        """
+        初始化 WorkDelta。
+
+        Args:
+            id (int): 作品id
+            work (Work): 最新的作品
+            changes (dict[str, tuple[Any, Any]]): {字段: (旧值, 新值)}
+            interval (float): 下一次轮询的间隔（秒）
+        """
+        self.id, self.work, self.changes, self.interval = id, work, changes, interval
+
+    def __repr__(self) -> str:
+        changes = " ".join(f"{k}={a}->{b}" for k, (a, b) in self.changes.items())
+        return f"<WorkDelta id={self.id} {changes}>"
+
+
+class _Watched:
+    snapshot: Optional[dict[str, Any]]
+    interval: float
+    due: float
+
+    def __init__(self, interval: float, due: float):
+        self.snapshot, self.interval, self.due = None, interval, due
+
+
+class WorkWatcher:
+    """
+    轮询一组作品的统计数据，只在数据变化时产生事件。
+
+    每个作品有自己的轮询间隔：数据变化后缩短为 min_interval，没有变化时乘以 backoff，最长为 max_interval。
+    第一次轮询只记录初始数据，不产生事件。
+    """
+
+    fields: tuple[str, ...]  # 比较的字段
+    min_interval: float  # 最短轮询间隔（秒）
+    max_interval: float  # 最长轮询间隔（秒）
+    backoff: float  # 没有变化时间隔的增长倍数
+    concurrency: int  # 同时进行的请求数
+    polls: int  # 请求次数
+    changes: int  # 产生的事件数
+    errors: int  # 失败的请求数
+    __user: Optional[User]
+    __client: Optional[Client]
+    __watched: dict[int, _Watched]
+    __heap: list[tuple[float, int]]
+    __wake: asyncio.Event
+    __closed: bool
+
+    def __init__(
+        self,
+        ids: Iterable[int] = (),
+        user: Optional[User] = None,
+        client: Optional[Client] = None,
+        fields: Iterable[str] = WATCHED_FIELDS,
+        min_interval: float = 10.0,
+        max_interval: float = 600.0,
+        backoff: float = 2.0,
+        concurrency: int = 10,
+    ):
+        """
+        初始化 WorkWatcher。
+
+        Args:
+            ids (Iterable[int], optional): 作品id。默认为空。
+            user (Optional[User], optional): 用户上下文。默认为 None。
+            client (Optional[Client], optional): 客户端。默认沿用 user 的客户端。
+            fields (Iterable[str], optional): 比较的字段。默认为赞数、观看数、评论数、收藏数、改编数和热度。
+            min_interval (float, optional): 最短轮询间隔（秒）。默认为 10。
+            max_interval (float, optional): 最长轮询间隔（秒）。默认为 600。
+            backoff (float, optional): 没有变化时间隔的增长倍数。默认为 2。
+            concurrency (int, optional): 同时进行的请求数。默认为 10。
+        """
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("intervals must satisfy 0 < min_interval <= max_interval")
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.fields = tuple(fields)
+        self.min_interval, self.max_interval = min_interval, max_interval
+        self.backoff, self.concurrency = backoff, concurrency
+        self.polls = self.changes = self.errors = 0
+        self.__user = user
+        self.__client = user.client if client == None and user != None else client
+        self.__watched, self.__heap = {}, []
+        self.__wake = asyncio.Event()
+        self.__closed = False
+        for id in ids:
+            self.add(id)
+
+    def __schedule(self, id: int, watched: _Watched, due: float):
+        watched.due = due
+        heapq.heappush(self.__heap, (due, id))
+
+    def add(self, id: int):
+        """
+        开始监视作品，立即进行第一次轮询。已在监视时不做任何事。
+
+        Args:
+            id (int): 作品id
+        """
+        if id in self.__watched:
+            return
+        watched = _Watched(self.min_interval, 0.0)
+        self.__watched[id] = watched
+        self.__schedule(id, watched, time.monotonic())
+        self.__wake.set()
+
+    def remove(self, id: int):
+        """
+        停止监视作品。
+
+        Args:
+            id (int): 作品id
+        """
+        self.__watched.pop(id, None)
+
+    def __len__(self) -> int:
+        return len(self.__watched)
+
+    def close(self):
+        """
+        停止监视，正在进行的 async for 会在当前一批请求完成后结束。
+        """
+        self.__closed = True
+        self.__wake.set()
+
+    def __diff(self, old: dict[str, Any], new: Any) -> dict[str, tuple[Any, Any]]:
+        return {
+            key: (old.get(key), new.get(key))
+            for key in self.fields
+            if old.get(key) != new.get(key)
+        }
+
+    async def __poll(
+        self, api: Client, id: int
+    ) -> tuple[int, Optional[Work], Optional[Exception]]:
+        try:
+            data = await _fetch_work(api, id, self.__user, fresh=True)
+            return id, Work(data, self.__user, self.__client), None
+        except (
+            APIException,
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            ValueError,
+        ) as e:
+            # ValueError: 响应不是 JSON
+            return id, None, e
+
+    async def __aiter__(self) -> AsyncGenerator[WorkDelta, Any]:
+        """
+        按计划轮询作品，产生变化事件。在调用 close 之前不会结束。
+
+        Returns:
+            AsyncGenerator[WorkDelta, Any]: 变化事件生成器，使用async for遍历
+        """
+        async with _use_client(self.__client) as api:
+            while not self.__closed:
+                # 丢弃已移除或已重新安排的作品留下的旧条目。
+                while self.__heap and (
+                    self.__heap[0][1] not in self.__watched
+                    or self.__watched[self.__heap[0][1]].due != self.__heap[0][0]
+                ):
+                    heapq.heappop(self.__heap)
+                now = time.monotonic()
+                if not self.__heap or self.__heap[0][0] > now:
+                    self.__wake.clear()
+                    timeout = self.__heap[0][0] - now if self.__heap else None
+                    try:
+                        await asyncio.wait_for(self.__wake.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                batch: list[int] = []
+                while self.__heap and self.__heap[0][0] <= now:
+                    due, id = heapq.heappop(self.__heap)
+                    if id in self.__watched and self.__watched[id].due == due:
+                        batch.append(id)
+                    if len(batch) >= self.concurrency:
+                        break
+                results = await asyncio.gather(*(self.__poll(api, i) for i in batch))
+                now = time.monotonic()
+                for id, work, error in results:
+                    self.polls += 1
+                    watched = self.__watched.get(id)
+                    if watched == None:
+                        continue
+                    if work == None:
+                        self.errors += 1
+                        watched.interval = min(
+                            self.max_interval, watched.interval * self.backoff
+                        )
+                        self.__schedule(id, watched, now + watched.interval)
+                        continue
+                    data, first = work.data, watched.snapshot == None
+                    changes = {} if first else self.__diff(watched.snapshot, data)
+                    watched.snapshot = {k: data.get(k) for k in self.fields}
+                    if changes:
+                        watched.interval = self.min_interval
+                    elif not first:
+                        watched.interval = min(
+                            self.max_interval, watched.interval * self.backoff
+                        )
+                    self.__schedule(id, watched, now + watched.interval)
+                    if changes:
+                        self.changes += 1
+                        yield WorkDelta(id, work, changes, watched.interval)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        获得统计信息。
+
+        Returns:
+            dict[str, Any]: 监视的作品数、请求数、事件数、失败数和各作品当前的轮询间隔
+        """
+        return {
+            "works": len(self.__watched),
+            "polls": self.polls,
+            "changes": self.changes,
+            "errors": self.errors,
+            "intervals": {id: i.interval for id, i in self.__watched.items()},
+        }
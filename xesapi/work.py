@@ -1,13 +1,65 @@
-import aiohttp
 from .user import User, APIResponse
-from .type import Work_Data, Comment_Data, ReplyList_Data, Reply_Data, GetComment_Data
+from .client import Client, _use_client
+from .type import Work_Data, Comment_Data, ReplyList_Data, Reply_Data
 from .base import APIException
-from typing import Optional, AsyncGenerator, Any
+from .page import _pages, PerPage
+from .limit import RateLimiter
+from .deadline import Deadline
+from .model import CompactWork, CompactComment, CompactReply
+from .asset import AssetCache, AssetDownloader
+from typing import Optional, AsyncGenerator, Iterable, Union, Any
+from collections import deque
+from contextlib import aclosing
+import itertools
+import asyncio
+import time
+import aiohttp
+import os
 
 
 class Reply:
     __data: Reply_Data
     __user: Optional[User]
+    __client: Optional[Client]
+
+    @property
+    def data(self) -> Reply_Data:
+        """
+        获得回复数据。
+
+        Returns:
+            Reply_Data: 回复数据
+        """
+        return self.__data
+
+    @property
+    def user(self) -> Optional[User]:
+        """
+        获得用户上下文。
+
+        Returns:
+            Optional[User]: 用户上下文，未登录时为 None
+        """
+        return self.__user
+
+    @property
+    def client(self) -> Optional[Client]:
+        """
+        获得客户端。
+
+        Returns:
+            Optional[Client]: 客户端，未绑定时为 None
+        """
+        return self.__client
+
+    def compact(self) -> CompactReply:
+        """
+        转换为占用内存更少的 CompactReply，适合大量保存。
+
+        Returns:
+            CompactReply: 紧凑的回复数据
+        """
+        return CompactReply(self.__data)
 
     async def send(self, content: str):
         """
@@ -22,11 +74,11 @@ class Reply:
         if self.__user == None:
             raise APIException("未登录")
         else:
-            async with aiohttp.ClientSession(
-                "https://code.xueersi.com/", cookies={"xes_rfh": self.__user.xes_rfh}
-            ) as session:
-                async with session.post(
+            async with _use_client(self.__client) as client:
+                c: APIResponse[None] = await client.fetch(
+                    "POST",
                     "/api/comments/submit",
+                    self.__user,
                     data={
                         "appid": 1001108,
                         "content": content,
@@ -34,27 +86,71 @@ class Reply:
                         "topic_id": self.__data["topic_id"],
                     },
                     headers={"Content-Type": "application/json", "User-Agent": "_"},
-                ) as req:
-                    c: APIResponse[None] = await req.json()
-                    if c["stat"] != 1:
-                        raise APIException(
-                            c["message"] if c["msg"] == None else c["msg"]
-                        )
-
-    def __init__(self, data: Reply_Data, user: Optional[User] = None):
+                )
+                if c["stat"] != 1:
+                    raise APIException(c["message"] if c["msg"] == None else c["msg"])
+
+    def __init__(
+        self,
+        data: Reply_Data,
+        user: Optional[User] = None,
+        client: Optional[Client] = None,
+    ):
         """
         实例化一个回复。
 
         Args:
             data (Reply_Data): 回复数据。
             user (Optional[User], optional): 用户上下文。默认为 None。
+            client (Optional[Client], optional): 客户端。默认沿用 user 的客户端。
         """
         self.__data, self.__user = data, user
+        self.__client = client if client != None or user == None else user.client
 
 
 class Comment:
     __data: Comment_Data
     __user: Optional[User]
+    __client: Optional[Client]
+
+    @property
+    def data(self) -> Comment_Data:
+        """
+        获得评论数据。
+
+        Returns:
+            Comment_Data: 评论数据
+        """
+        return self.__data
+
+    @property
+    def user(self) -> Optional[User]:
+        """
+        获得用户上下文。
+
+        Returns:
+            Optional[User]: 用户上下文，未登录时为 None
+        """
+        return self.__user
+
+    @property
+    def client(self) -> Optional[Client]:
+        """
+        获得客户端。
+
+        Returns:
+            Optional[Client]: 客户端，未绑定时为 None
+        """
+        return self.__client
+
+    def compact(self) -> CompactComment:
+        """
+        转换为占用内存更少的 CompactComment，适合大量保存。
+
+        Returns:
+            CompactComment: 紧凑的评论数据
+        """
+        return CompactComment(self.__data)
 
     async def send(self, content: str):
         """
@@ -69,11 +165,11 @@ class Comment:
         if self.__user == None:
             raise APIException("未登录")
         else:
-            async with aiohttp.ClientSession(
-                "https://code.xueersi.com/", cookies={"xes_rfh": self.__user.xes_rfh}
-            ) as session:
-                async with session.post(
+            async with _use_client(self.__client) as client:
+                c: APIResponse[None] = await client.fetch(
+                    "POST",
                     "/api/comments/submit",
+                    self.__user,
                     data={
                         "appid": 1001108,
                         "content": content,
@@ -81,64 +177,132 @@ class Comment:
                         "topic_id": self.__data["topic_id"],
                     },
                     headers={"Content-Type": "application/json", "User-Agent": "_"},
-                ) as req:
-                    c: APIResponse[None] = await req.json()
-                    if c["stat"] != 1:
-                        raise APIException(
-                            c["message"] if c["msg"] == None else c["msg"]
-                        )
-
-    async def reply(self) -> AsyncGenerator[Reply, Any]:
+                )
+                if c["stat"] != 1:
+                    raise APIException(c["message"] if c["msg"] == None else c["msg"])
+
+    async def reply(
+        self,
+        prefetch: int = 1,
+        per_page: PerPage = 10,
+        deadline: Optional[Deadline] = None,
+    ) -> AsyncGenerator[Reply, Any]:
         """
         获得评论。
 
+        先返回评论自带的回复，再请求剩余的回复。自带的回复即按时间排序的前几条回复，
+        因此已经覆盖的整页不会再次请求。
+
+        Args:
+            prefetch (int, optional): 同时请求的页数。默认为 1。
+            per_page (PerPage, optional): 每页数量，"auto" 为使用服务器接受的最大数量。默认为 10。
+            deadline (Optional[Deadline], optional): 所有页面共用的截止时间，超过时抛出 TimeoutError。默认为 None。
+
+        Raises:
+            ValueError: per_page 小于 1
+
         Returns:
             AsyncGenerator[Comment]: 评论生成器，使用async for遍历
         """
-        if not self.__data["reply_list"]["hasMore"]:
-            for i in self.__data["reply_list"]["data"]:
-                yield Reply(i, self.__user)
-        else:
-            async with aiohttp.ClientSession(
-                "https://code.xueersi.com/",
-                cookies={} if self.__user == None else {"xes_rfh": self.__user.xes_rfh},
-            ) as session:
-                page = 1
-                while True:
-                    async with session.get(
-                        "/api/comments?appid=1001108&topic_id="
-                        + self.__data["topic_id"]
-                        + "&parent_id="
-                        + self.__data["id"]
-                        + f"&order_type=time&page={page}&per_page=10",
-                        headers={"User-Agent": "_"},
-                    ) as req:
-                        c: APIResponse[GetComment_Data[Reply_Data]] = await req.json()
-                        if c["stat"] != 1 or c["data"] == None:
-                            raise APIException(
-                                c["message"] if c["msg"] == None else c["msg"]
-                            )
-                        for i in c["data"]["data"]:
-                            yield Reply(i, self.__user)
-                        if len(c["data"]["data"]) != 10:
-                            break
-                        else:
-                            page += 1
-
-    def __init__(self, data: Comment_Data, user: Optional[User] = None):
+        if per_page != "auto" and per_page < 1:
+            raise ValueError("per_page must be at least 1")
+        embedded = self.__data["reply_list"]["data"]
+        for i in embedded:
+            yield Reply(i, self.__user, self.__client)
+        if self.__data["reply_list"]["hasMore"]:
+            seen = set(i["id"] for i in embedded)
+            async with _use_client(self.__client) as client:
+                scope = f"{self.__data['topic_id']}/{self.__data['id']}"
+                begin = time.time()
+                if client.store != None and client.store.synced(scope):
+                    for i in client.store.replies(self.__data["id"]):
+                        if i["id"] not in seen:
+                            yield Reply(i, self.__user, self.__client)
+                    return
+                async for data in _pages(
+                    client,
+                    lambda page, size: "/api/comments?appid=1001108&topic_id="
+                    + self.__data["topic_id"]
+                    + "&parent_id="
+                    + str(self.__data["id"])
+                    + f"&order_type=time&page={page}&per_page={size}",
+                    self.__user,
+                    per_page,
+                    prefetch,
+                    1 if per_page == "auto" else len(embedded) // per_page + 1,
+                    deadline,
+                ):
+                    if client.store != None:
+                        client.store.upsert_replies(data)
+                    for i in data:
+                        if i["id"] not in seen:
+                            yield Reply(i, self.__user, self.__client)
+                if client.store != None:
+                    # 自带的回复不在请求的页面中，重新写入，以免被当作已删除。
+                    client.store.upsert_replies(embedded)
+                    client.store.mark_synced(scope, begin)
+
+    def __init__(
+        self,
+        data: Comment_Data,
+        user: Optional[User] = None,
+        client: Optional[Client] = None,
+    ):
         """
         实例化一个评论。
 
         Args:
             data (Comment_Data): 评论数据。
             user (Optional[User], optional): 用户上下文。默认为 None。
+            client (Optional[Client], optional): 客户端。默认沿用 user 的客户端。
         """
         self.__data, self.__user = data, user
+        self.__client = client if client != None or user == None else user.client
 
 
 class Work:
     __data: Work_Data
     __user: Optional[User]
+    __client: Optional[Client]
+
+    @property
+    def data(self) -> Work_Data:
+        """
+        获得作品数据。
+
+        Returns:
+            Work_Data: 作品数据
+        """
+        return self.__data
+
+    @property
+    def user(self) -> Optional[User]:
+        """
+        获得用户上下文。
+
+        Returns:
+            Optional[User]: 用户上下文，未登录时为 None
+        """
+        return self.__user
+
+    @property
+    def client(self) -> Optional[Client]:
+        """
+        获得客户端。
+
+        Returns:
+            Optional[Client]: 客户端，未绑定时为 None
+        """
+        return self.__client
+
+    def compact(self) -> CompactWork:
+        """
+        转换为占用内存更少的 CompactWork，适合大量保存。
+
+        Returns:
+            CompactWork: 紧凑的作品数据
+        """
+        return CompactWork(self.__data)
 
     async def like(self):
         """
@@ -150,11 +314,11 @@ class Work:
         if self.__user == None:
             raise APIException("未登录")
         else:
-            async with aiohttp.ClientSession(
-                "https://code.xueersi.com/", cookies={"xes_rfh": self.__user.xes_rfh}
-            ) as session:
-                async with session.post(
+            async with _use_client(self.__client) as client:
+                c: APIResponse[None] = await client.fetch(
+                    "POST",
                     "/api/compilers/40576653/like",
+                    self.__user,
                     data={
                         "params": {
                             "id": str(self.__data["id"]),
@@ -163,13 +327,10 @@ class Work:
                         }
                     },
                     headers={"User-Agent": "_"},
-                ) as req:
-                    c: APIResponse[None] = await req.json()
-                    if c["stat"] != 1:
-                        raise APIException(
-                            c["message"] if c["msg"] == None else c["msg"]
-                        )
-                    self.__data["likes"] += 1
+                )
+                if c["stat"] != 1:
+                    raise APIException(c["message"] if c["msg"] == None else c["msg"])
+                self.__data["likes"] += 1
 
     async def unlike(self):
         """
@@ -181,11 +342,11 @@ class Work:
         if self.__user == None:
             raise APIException("未登录")
         else:
-            async with aiohttp.ClientSession(
-                "https://code.xueersi.com/", cookies={"xes_rfh": self.__user.xes_rfh}
-            ) as session:
-                async with session.post(
+            async with _use_client(self.__client) as client:
+                c: APIResponse[None] = await client.fetch(
+                    "POST",
                     "/api/compilers/40576653/unlike",
+                    self.__user,
                     data={
                         "params": {
                             "id": str(self.__data["id"]),
@@ -194,13 +355,10 @@ class Work:
                         }
                     },
                     headers={"User-Agent": "_"},
-                ) as req:
-                    c: APIResponse[None] = await req.json()
-                    if c["stat"] != 1:
-                        raise APIException(
-                            c["message"] if c["msg"] == None else c["msg"]
-                        )
-                    self.__data["likes"] += 1
+                )
+                if c["stat"] != 1:
+                    raise APIException(c["message"] if c["msg"] == None else c["msg"])
+                self.__data["likes"] += 1
 
     async def send(self, content: str):
         """
@@ -215,11 +373,11 @@ class Work:
         if self.__user == None:
             raise APIException("未登录")
         else:
-            async with aiohttp.ClientSession(
-                "https://code.xueersi.com/", cookies={"xes_rfh": self.__user.xes_rfh}
-            ) as session:
-                async with session.post(
+            async with _use_client(self.__client) as client:
+                c: APIResponse[None] = await client.fetch(
+                    "POST",
                     "/api/comments/submit",
+                    self.__user,
                     data={
                         "appid": 1001108,
                         "content": content,
@@ -227,75 +385,364 @@ class Work:
                         "topic_id": self.__data["topic_id"],
                     },
                     headers={"Content-Type": "application/json", "User-Agent": "_"},
-                ) as req:
-                    c: APIResponse[None] = await req.json()
-                    if c["stat"] != 1:
-                        raise APIException(
-                            c["message"] if c["msg"] == None else c["msg"]
-                        )
+                )
+                if c["stat"] != 1:
+                    raise APIException(c["message"] if c["msg"] == None else c["msg"])
+
+    async def download(
+        self,
+        directory: str,
+        cache: Optional[AssetCache] = None,
+        concurrency: int = 8,
+    ) -> dict[str, str]:
+        """
+        下载作品的封面、音频、视频和素材。
+
+        Args:
+            directory (str): 输出目录
+            cache (Optional[AssetCache], optional): 素材缓存，多个作品共用时相同的素材只下载一次。默认使用 directory 下的 .assets 目录。
+            concurrency (int, optional): 最大并发下载数。默认为 8。
+
+        Raises:
+            APIException: 素材列表无法获得，或有文件下载失败
 
-    async def comment(self) -> AsyncGenerator[Comment, Any]:
+        Returns:
+            dict[str, str]: {文件名: 路径}
+        """
+        owned = cache == None
+        if cache == None:
+            cache = AssetCache(os.path.join(directory, ".assets"))
+        try:
+            async with _use_client(self.__client) as client:
+                downloader = AssetDownloader(client, cache, concurrency)
+                try:
+                    return await downloader.download(self.__data, directory)
+                finally:
+                    # 被取消时，共用的下载任务可能仍在进行，先结束它们再关闭缓存和连接。
+                    await downloader.cancel()
+        finally:
+            if owned:
+                cache.close()
+
+    async def comment(
+        self,
+        prefetch: int = 1,
+        per_page: PerPage = 15,
+        start: int = 1,
+        deadline: Optional[Deadline] = None,
+    ) -> AsyncGenerator[Comment, Any]:
         """
         获得评论。
 
+        Args:
+            prefetch (int, optional): 同时请求的页数，大于 1 时会提前请求后续页面。默认为 1。
+            per_page (PerPage, optional): 每页数量，"auto" 为使用服务器接受的最大数量。默认为 15。
+            start (int, optional): 起始页码。默认为 1。
+            deadline (Optional[Deadline], optional): 所有页面共用的截止时间，超过时抛出 TimeoutError。默认为 None。
+
         Returns:
             AsyncGenerator[Comment]: 评论生成器，使用async for遍历
         """
-        async with aiohttp.ClientSession(
-            "https://code.xueersi.com/",
-            cookies={} if self.__user == None else {"xes_rfh": self.__user.xes_rfh},
-        ) as session:
-            page = 1
-            while True:
-                async with session.get(
-                    "/api/comments?appid=1001108&topic_id="
+        # 只有从第一页完整遍历时，才能确认存储中已有全部评论。
+        async with _use_client(self.__client) as client:
+            store = client.store if start == 1 else None
+            begin = time.time()
+            if store != None and store.synced(self.__data["topic_id"]):
+                for i in store.comments(self.__data["topic_id"]):
+                    yield Comment(i, self.__user, self.__client)
+                return
+            async for data in _pages(
+                client,
+                lambda page, size: "/api/comments?appid=1001108&topic_id="
+                + self.__data["topic_id"]
+                + f"&parent_id=0&order_type=time&page={page}&per_page={size}",
+                self.__user,
+                per_page,
+                prefetch,
+                start,
+                deadline,
+            ):
+                if client.store != None:
+                    client.store.upsert_comments(data)
+                for i in data:
+                    yield Comment(i, self.__user, self.__client)
+            if store != None:
+                store.mark_synced(self.__data["topic_id"], begin)
+
+    async def comment_since(
+        self,
+        since: Optional[int] = None,
+        per_page: PerPage = 15,
+        deadline: Optional[Deadline] = None,
+    ) -> tuple[list[Comment], Optional[int]]:
+        """
+        增量获得评论：只获得 id 大于 since 的评论，遇到已见过的评论即停止翻页。
+
+        评论按时间倒序返回，因此新评论都在最前面。置顶评论不参与停止判断。
+
+        Args:
+            since (Optional[int], optional): 上次返回的水位线（已见过的最大评论 id）。为 None 时获得全部评论。
+            per_page (PerPage, optional): 每页数量。默认为 15。
+            deadline (Optional[Deadline], optional): 所有页面共用的截止时间。默认为 None。
+
+        Raises:
+            APIException: API 错误
+            TimeoutError: 超过截止时间
+
+        Returns:
+            tuple[list[Comment], Optional[int]]: (新评论, 新的水位线)，没有新评论时水位线不变
+        """
+        result: list[Comment] = []
+        watermark = since
+        async with _use_client(self.__client) as client:
+            async with aclosing(
+                _pages(
+                    client,
+                    lambda page, size: "/api/comments?appid=1001108&topic_id="
                     + self.__data["topic_id"]
-                    + f"&parent_id=0&order_type=time&page={page}&per_page=15",
-                    headers={"User-Agent": "_"},
-                ) as req:
-                    c: APIResponse[GetComment_Data[Comment_Data]] = await req.json()
-                    if c["stat"] != 1 or c["data"] == None:
-                        raise APIException(
-                            c["message"] if c["msg"] == None else c["msg"]
-                        )
-                    for i in c["data"]["data"]:
-                        yield Comment(i, self.__user)
-                    if len(c["data"]["data"]) != 15:
+                    + f"&parent_id=0&order_type=time&page={page}&per_page={size}",
+                    self.__user,
+                    per_page,
+                    deadline=deadline,
+                )
+            ) as pages:
+                async for data in pages:
+                    reached = False
+                    for i in data:
+                        if since != None and i["id"] <= since:
+                            if i["top"]:
+                                continue
+                            reached = True
+                            break
+                        result.append(Comment(i, self.__user, self.__client))
+                        if watermark == None or i["id"] > watermark:
+                            watermark = i["id"]
+                    if reached:
                         break
-                    else:
-                        page += 1
+        return result, watermark
+
+    async def thread(
+        self,
+        concurrency: int = 4,
+        prefetch: int = 1,
+        per_page: PerPage = 15,
+        start: int = 1,
+        deadline: Optional[Deadline] = None,
+    ) -> AsyncGenerator[tuple[Comment, list[Reply]], Any]:
+        """
+        获得完整的评论树：按顺序返回每条评论及其全部回复。
+
+        最多同时展开 concurrency 条评论的回复；回复全部自带在评论中的，不会发起请求。
+
+        Args:
+            concurrency (int, optional): 同时展开回复的评论数。默认为 4。
+            prefetch (int, optional): 评论列表同时请求的页数。默认为 1。
+            per_page (PerPage, optional): 评论列表每页数量。默认为 15。
+            start (int, optional): 评论列表的起始页码。默认为 1。
+            deadline (Optional[Deadline], optional): 评论和回复的所有请求共用的截止时间。默认为 None。
 
-    def __init__(self, data: Work_Data, user: Optional[User] = None):
+        Raises:
+            APIException: API 错误
+            TimeoutError: 超过截止时间
+
+        Returns:
+            AsyncGenerator[tuple[Comment, list[Reply]], Any]: (评论, 回复列表) 生成器，使用async for遍历
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        comments = self.comment(prefetch, per_page, start, deadline)
+        async with aclosing(_expand(comments, concurrency, deadline)) as thread:
+            async for item in thread:
+                yield item
+
+    def __init__(
+        self,
+        data: Work_Data,
+        user: Optional[User] = None,
+        client: Optional[Client] = None,
+    ):
         """
         实例化一个作品。
 
         Args:
             data (Work_Data): 作品数据。
             user (Optional[User], optional): 用户上下文。默认为 None。
+            client (Optional[Client], optional): 客户端。默认沿用 user 的客户端。
         """
         self.__data, self.__user = data, user
+        self.__client = client if client != None or user == None else user.client
 
 
-async def get_work(id: int, user: Optional[User] = None) -> Work:
+async def _expand(
+    comments: AsyncGenerator[Comment, Any],
+    concurrency: int,
+    deadline: Optional[Deadline] = None,
+) -> AsyncGenerator[tuple[Comment, list[Reply]], Any]:
+    """
+    按顺序展开每条评论的全部回复，最多同时展开 concurrency 条。
+
+    Args:
+        comments (AsyncGenerator[Comment, Any]): 评论生成器，结束时会被关闭
+        concurrency (int): 同时展开回复的评论数
+        deadline (Optional[Deadline], optional): 回复请求的截止时间。默认为 None。
+
+    Returns:
+        AsyncGenerator[tuple[Comment, list[Reply]], Any]: (评论, 回复列表) 生成器
+    """
+
+    async def expand(comment: Comment) -> tuple[Comment, list[Reply]]:
+        return comment, [i async for i in comment.reply(deadline=deadline)]
+
+    window: deque[asyncio.Task[tuple[Comment, list[Reply]]]] = deque()
+    try:
+        async with aclosing(comments) as iterator:
+            async for comment in iterator:
+                if len(window) >= concurrency:
+                    yield await window.popleft()
+                window.append(asyncio.ensure_future(expand(comment)))
+        while window:
+            yield await window.popleft()
+    finally:
+        for task in window:
+            task.cancel()
+        if window:
+            await asyncio.gather(*window, return_exceptions=True)
+
+
+async def _fetch_work(
+    api: Client,
+    id: int,
+    user: Optional[User],
+    fresh: bool = False,
+    deadline: Optional[Deadline] = None,
+) -> Work_Data:
+    # fresh 为 True 时跳过存储和缓存，总是请求最新数据。
+    if api.store != None and not fresh:
+        data = api.store.work(id)
+        if data != None:
+            return data
+    c: APIResponse[Work_Data] = await api.fetch(
+        "GET", f"/api/compilers/v2/{id}", user, cache=not fresh, deadline=deadline
+    )
+    # 失败的响应可能没有 stat（如 {"status_code": 404, "message": ...}）。
+    if not isinstance(c, dict) or c.get("stat") != 1 or c.get("data") == None:
+        error = c if isinstance(c, dict) else {}
+        raise APIException(error.get("msg") or error.get("message") or "未知错误")
+    if api.store != None:
+        api.store.upsert_works([c["data"]])
+    return c["data"]
+
+
+async def get_work(
+    id: int,
+    user: Optional[User] = None,
+    client: Optional[Client] = None,
+    deadline: Optional[Deadline] = None,
+) -> Work:
     """
     获得作品。
 
     Args:
         id (int): 作品id。
         user (Optional[User], optional): 用户上下文。默认为 None。
+        client (Optional[Client], optional): 客户端。默认沿用 user 的客户端。
+        deadline (Optional[Deadline], optional): 截止时间。默认为 None。
 
     Raises:
         APIException: API 错误
+        TimeoutError: 超时或超过截止时间
 
     Returns:
         Work: 作品实例
     """
-    async with aiohttp.ClientSession(
-        "https://code.xueersi.com/",
-        cookies={} if user == None else {"xes_rfh": user.xes_rfh},
-    ) as session:
-        async with session.get(f"/api/compilers/v2/{id}") as req:
-            c: APIResponse[Work_Data] = await req.json()
-            if c["stat"] != 1 or c["data"] == None:
-                raise APIException(c["message"] if c["msg"] == None else c["msg"])
-            return Work(c["data"], user)
+    if client == None and user != None:
+        client = user.client
+    async with _use_client(client) as api:
+        return Work(await _fetch_work(api, id, user, deadline=deadline), user, client)
+
+
+async def get_works(
+    ids: Iterable[int],
+    user: Optional[User] = None,
+    client: Optional[Client] = None,
+    concurrency: int = 10,
+    ordered: bool = True,
+    limiter: Optional[RateLimiter] = None,
+    deadline: Optional[Deadline] = None,
+) -> AsyncGenerator[tuple[int, Union[Work, Exception]], Any]:
+    """
+    批量获得作品。所有请求共用一个连接池，同时最多有 concurrency 个请求。
+
+    单个作品失败不会中断批量获取，失败的作品以异常的形式返回。
+
+    Args:
+        ids (Iterable[int]): 作品id，可以是惰性的迭代器。
+        user (Optional[User], optional): 用户上下文。默认为 None。
+        client (Optional[Client], optional): 客户端。默认沿用 user 的客户端。
+        concurrency (int, optional): 最大并发数。默认为 10。
+        ordered (bool, optional): 是否按 ids 的顺序返回。为 False 时按完成顺序返回。默认为 True。
+        limiter (Optional[RateLimiter], optional): 限速器，可在多个批次间共用。默认为 None。
+        deadline (Optional[Deadline], optional): 整个批次的截止时间。超过后不再开始新的请求，进行中的作品以 TimeoutError 返回。默认为 None。
+
+    Returns:
+        AsyncGenerator[tuple[int, Union[Work, Exception]], Any]: (作品id, 作品或异常) 生成器，使用async for遍历
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if client == None and user != None:
+        client = user.client
+
+    async def fetch(api: Client, id: int) -> tuple[int, Union[Work, Exception]]:
+        try:
+            if limiter != None:
+                await limiter.acquire()
+            data = await _fetch_work(api, id, user, deadline=deadline)
+            return id, Work(data, user, client)
+        except (
+            APIException,
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            ValueError,
+        ) as err:
+            # ValueError: 响应不是 JSON（如 200 状态码的 HTML 页面）
+            return id, err
+
+    it = (
+        iter(ids)
+        if deadline == None
+        else itertools.takewhile(lambda _: not deadline.expired, ids)
+    )
+    async with _use_client(client) as api:
+        if ordered:
+            window: deque[asyncio.Task[tuple[int, Union[Work, Exception]]]] = deque()
+            try:
+                for id in itertools.islice(it, concurrency):
+                    window.append(asyncio.ensure_future(fetch(api, id)))
+                while window:
+                    result = await window.popleft()
+                    for id in itertools.islice(it, 1):
+                        window.append(asyncio.ensure_future(fetch(api, id)))
+                    yield result
+            finally:
+                for task in window:
+                    task.cancel()
+                if window:
+                    await asyncio.gather(*window, return_exceptions=True)
+        else:
+            pending: set[asyncio.Task[tuple[int, Union[Work, Exception]]]] = set()
+            try:
+                for id in itertools.islice(it, concurrency):
+                    pending.add(asyncio.ensure_future(fetch(api, id)))
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for id in itertools.islice(it, len(done)):
+                        pending.add(asyncio.ensure_future(fetch(api, id)))
+                    for task in done:
+                        yield task.result()
+            finally:
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)